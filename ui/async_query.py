@@ -0,0 +1,191 @@
+import queue
+import threading
+import tkinter
+from concurrent.futures import ThreadPoolExecutor
+from cancellation import CancelToken
+from db_connection import DatabaseConnection
+from query_stats import attributed_to, call_site
+
+class AsyncQueryRunner:
+    """Runs database work on worker threads and delivers results on the Tk thread"""
+
+    def __init__(self, root, max_workers: int = 4, poll_interval: int = 20):
+        """
+        Initialize the runner
+
+        Args:
+            root: Tk root whose mainloop receives the callbacks
+            max_workers (int): Worker threads, best kept at or below the pool max_size
+            poll_interval (int): Milliseconds between checks for finished work
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._done = queue.SimpleQueue()
+        self._latest = {}  # key -> newest future submitted under that key
+        self._tokens = {}  # future -> CancelToken while cancellable work runs
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+
+    def submit(self, func, *args, on_success=None, on_error=None, key=None,
+               cancel_previous: bool = True, cancellable: bool = False, **kwargs):
+        """
+        Run func(*args, **kwargs) on a worker thread
+
+        Must be called from the Tk thread. Callbacks run on the Tk thread.
+
+        Args:
+            func (callable): Work to run off the UI thread
+            on_success (callable, optional): Receives the return value
+            on_error (callable, optional): Receives the raised exception
+            key (str, optional): Only the newest request per key delivers its
+                result; older ones are superseded
+            cancel_previous (bool): Also cancel a superseded request that has
+                not started yet; pass False for writes that must still run
+            cancellable (bool): Pass a CancelToken to func as cancel= so a
+                superseded or cancelled query is also stopped while running
+
+        Returns:
+            concurrent.futures.Future: Handle for the submitted work
+        """
+        if self._closed:
+            raise RuntimeError("AsyncQueryRunner has been shut down")
+
+        site = call_site()
+        token = None
+        if cancellable:
+            token = CancelToken()
+            kwargs["cancel"] = token
+
+        def run():
+            with attributed_to(site):
+                return func(*args, **kwargs)
+
+        future = self._executor.submit(run)
+
+        previous = None
+        with self._lock:
+            if token is not None:
+                self._tokens[future] = token
+            if key is not None:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+        if previous is not None and cancel_previous:
+            self._cancel_future(previous)
+
+        self._pending += 1
+        future.add_done_callback(self._finished(key, on_success, on_error))
+        self._schedule_poll()
+        return future
+
+    def submit_query(self, query, params=None, on_success=None, on_error=None, key=None, **options):
+        """
+        Run a read query with DatabaseConnection.execute_query off the UI thread
+
+        Args:
+            query (str): SQL query to execute
+            params (tuple, optional): Query parameters
+            on_success (callable, optional): Receives the fetched rows
+            on_error (callable, optional): Receives the raised exception
+            key (str, optional): Supersede earlier queries with the same key
+            **options: Extra execute_query arguments such as row_factory or cache_ttl
+
+        Returns:
+            concurrent.futures.Future: Handle for the query
+        """
+        return self.submit(
+            DatabaseConnection.execute_query, query, params,
+            fetch=True, on_success=on_success, on_error=on_error, key=key,
+            cancellable=True, **options
+        )
+
+    def cancel(self, key) -> bool:
+        """
+        Drop the pending request for a key
+
+        Returns:
+            bool: True if there was a request to drop
+        """
+        with self._lock:
+            future = self._latest.pop(key, None)
+        if future is None:
+            return False
+        self._cancel_future(future)
+        return True
+
+    def _cancel_future(self, future):
+        """Drop a request if it is still queued, or stop its query if it is running"""
+        if future.cancel():
+            return
+        with self._lock:
+            token = self._tokens.get(future)
+        if token is not None:
+            token.cancel()
+
+    def _finished(self, key, on_success, on_error):
+        """Done callback that queues a result for the Tk thread"""
+        def done(future):
+            with self._lock:
+                self._tokens.pop(future, None)
+            self._done.put((future, key, on_success, on_error))
+        return done
+
+    def _schedule_poll(self):
+        """Make sure the Tk thread checks for finished work"""
+        if self._polling or self._closed:
+            return
+        try:
+            self.root.after(self.poll_interval, self._drain)
+            self._polling = True
+        except tkinter.TclError:
+            # Window is gone, nobody is left to receive results
+            self.shutdown()
+
+    def _drain(self):
+        """Deliver finished results on the Tk thread"""
+        self._polling = False
+        while True:
+            try:
+                future, key, on_success, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending -= 1
+
+            if key is not None:
+                with self._lock:
+                    if self._latest.get(key) is not future:
+                        continue  # Superseded by a newer request
+                    del self._latest[key]
+
+            if future.cancelled() or self._closed:
+                continue
+
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_success:
+                        on_success(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    print(f"Background query failed: {error}")
+            except tkinter.TclError as e:
+                # Callback touched widgets that were destroyed meanwhile
+                print(f"Discarded result for a closed view: {e}")
+
+        if self._pending > 0:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Cancel queued work and stop delivering results"""
+        self._closed = True
+        with self._lock:
+            self._latest.clear()
+            tokens = list(self._tokens.values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Queries already on the server would otherwise hold their connections
+        for token in tokens:
+            token.cancel()
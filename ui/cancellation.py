@@ -0,0 +1,70 @@
+import threading
+
+class QueryTimeoutError(Exception):
+    """Raised when a statement runs or waits for locks longer than its timeout"""
+
+
+class QueryCancelledError(Exception):
+    """Raised when a statement is stopped through its CancelToken"""
+
+
+class CancelToken:
+    """Lets another thread stop statements while they run on the server"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        # Statements using this token right now, e.g. the queries of a batch
+        self._running = {}  # id(connection) -> (backend, connection)
+
+    def cancel(self):
+        """
+        Stop the statements using this token, now or as soon as they start
+
+        Safe to call from the Tk thread: stopping a running MySQL statement
+        needs a second connection, which is opened in the background.
+        """
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            running = bool(self._running)
+
+        if running:
+            threading.Thread(target=self._interrupt, name="db-cancel", daemon=True).start()
+
+    def _interrupt(self):
+        """Ask the server to stop the statements that are still running"""
+        # Holding the lock keeps the connections from going back to the pool,
+        # and so from running someone else's statement, until this is done
+        with self._lock:
+            for backend, connection in self._running.values():
+                try:
+                    backend.cancel(connection)
+                except Exception as e:
+                    print(f"Could not cancel query: {e}")
+
+    def attach(self, backend, connection):
+        """
+        Register the connection a statement is about to run on
+
+        Raises:
+            QueryCancelledError: If the token was cancelled already
+        """
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledError("Query cancelled before it started")
+            self._running[id(connection)] = (backend, connection)
+
+    def detach(self, connection):
+        """Forget a connection once its statement has finished"""
+        with self._lock:
+            self._running.pop(id(connection), None)
+
+    def check(self):
+        """
+        Raises:
+            QueryCancelledError: If the token was cancelled
+        """
+        if self.cancelled:
+            raise QueryCancelledError("Query cancelled")
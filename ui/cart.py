@@ -3,7 +3,8 @@ import subprocess
 import sys
 import os
 from PIL import Image
-from db_connection import DatabaseConnection
+from cart_repository import CartRepository
+from async_query import AsyncQueryRunner
 from image_handler import ImageHandler
 
 class ShoppingCartApp:
@@ -23,6 +24,10 @@ class ShoppingCartApp:
 
         # Cart items list
         self.cart_items = []
+
+        # Runs cart writes off the UI thread, one at a time so each redraw
+        # sees every earlier click
+        self.query_runner = AsyncQueryRunner(self.root, max_workers=1)
         
         # Initialize image handler
         self.image_handler = ImageHandler()
@@ -38,19 +43,7 @@ class ShoppingCartApp:
             return []
 
         try:
-            query = """
-            SELECT ci.cart_item_id, mi.menu_item_id, mi.item_name, mi.price, ci.quantity, r.restaurant_name, r.restaurant_id
-            FROM CartItems ci
-            JOIN MenuItems mi ON ci.menu_item_id = mi.menu_item_id
-            JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
-            WHERE ci.user_id = %s
-            """
-            cart_items = DatabaseConnection.execute_query(
-                query, 
-                params=(self.user_id,), 
-                fetch=True
-            )
-            return cart_items
+            return CartRepository.items(self.user_id)
         except Exception as e:
             print(f"Error fetching cart items: {e}")
             return []
@@ -287,40 +280,41 @@ class ShoppingCartApp:
     def update_quantity(self, cart_item, change):
         """
         Update quantity of an item in the cart
+
+        The write and the refresh run on a worker thread so a slow database
+        never freezes the window; the cart is redrawn when they finish
         """
-        try:
-            # Update quantity in database
-            update_query = """
-            UPDATE CartItems 
-            SET quantity = GREATEST(0, quantity + %s)
-            WHERE cart_item_id = %s
-            """
-            DatabaseConnection.execute_query(
-                update_query, 
-                params=(change, cart_item.get('cart_item_id'))
-            )
+        self.query_runner.submit(
+            self.apply_quantity_change,
+            cart_item,
+            change,
+            key="cart",
+            # Every click must still be written, only stale redraws are dropped
+            cancel_previous=False,
+            on_success=self.show_cart_items,
+            on_error=lambda e: print(f"Error updating cart item quantity: {e}")
+        )
 
-            # Delete item if quantity reaches 0
-            if cart_item.get('quantity', 0) + change <= 0:
-                delete_query = """
-                DELETE FROM CartItems 
-                WHERE cart_item_id = %s
-                """
-                DatabaseConnection.execute_query(
-                    delete_query, 
-                    params=(cart_item.get('cart_item_id'),)
-                )
+    def apply_quantity_change(self, cart_item, change):
+        """
+        Write a quantity change and return the refreshed cart items
+        """
+        # Each statement is atomic on its own; a decrement to zero deletes the row
+        CartRepository.change_quantity(cart_item.get('cart_item_id'), change)
 
-            # Refresh cart items
-            self.cart_items = self.fetch_cart_items()
-            self.create_cart_items()
+        return self.fetch_cart_items()
 
-            # Update total amount
-            total_amount = sum(item.get('price', 0) * item.get('quantity', 0) for item in self.cart_items)
-            self.total_amount_label.configure(text=f"${total_amount:.2f}")
+    def show_cart_items(self, cart_items):
+        """
+        Redraw the cart with freshly fetched items
+        """
+        # Refresh cart items
+        self.cart_items = cart_items
+        self.create_cart_items()
 
-        except Exception as e:
-            print(f"Error updating cart item quantity: {e}")
+        # Update total amount
+        total_amount = sum(item.get('price', 0) * item.get('quantity', 0) for item in self.cart_items)
+        self.total_amount_label.configure(text=f"${total_amount:.2f}")
 
     def proceed_to_payment(self):
         """
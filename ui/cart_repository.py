@@ -0,0 +1,189 @@
+from typing import Iterable, Optional, Tuple
+from db_connection import DatabaseConnection
+
+class CartRepository:
+    """Cart reads and writes, each write a single atomic statement on CartItems"""
+
+    # CartItems is UNIQUE (user_id, menu_item_id), so adding is one upsert
+    # rather than a locked SELECT then UPDATE or INSERT. Writes autocommit
+    # unless a transaction is passed as tx. MySQL counts 1 affected row for
+    # an insert and 2 for an update.
+    ADD_ITEM = """
+    INSERT INTO CartItems (user_id, menu_item_id, quantity)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity = quantity + %s
+    """
+
+    ADD_ITEMS = """
+    INSERT INTO CartItems (user_id, menu_item_id, quantity)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+    """
+
+    # OrderItems has a quantity column too, so MySQL needs the update
+    # qualified with the target table
+    ADD_ORDER_ITEMS = """
+    INSERT INTO CartItems (user_id, menu_item_id, quantity)
+    SELECT %s, oi.menu_item_id, oi.quantity
+    FROM OrderItems oi
+    WHERE oi.order_id = %s
+    ON DUPLICATE KEY UPDATE CartItems.quantity = CartItems.quantity + VALUES(quantity)
+    """
+
+    INCREASE_QUANTITY = """
+    UPDATE CartItems
+    SET quantity = quantity + %s
+    WHERE cart_item_id = %s
+    """
+
+    # Decrements delete the row if it would reach zero, otherwise lower the
+    # quantity; the conditions make each statement safe against a
+    # concurrent change without locking
+    DELETE_IF_EXHAUSTED = """
+    DELETE FROM CartItems
+    WHERE cart_item_id = %s AND quantity <= %s
+    """
+
+    DECREASE_QUANTITY = """
+    UPDATE CartItems
+    SET quantity = quantity - %s
+    WHERE cart_item_id = %s AND quantity > %s
+    """
+
+    REMOVE_ITEM = "DELETE FROM CartItems WHERE cart_item_id = %s"
+
+    ITEMS = """
+    SELECT ci.cart_item_id, mi.menu_item_id, mi.item_name, mi.price, ci.quantity, r.restaurant_name, r.restaurant_id
+    FROM CartItems ci
+    JOIN MenuItems mi ON ci.menu_item_id = mi.menu_item_id
+    JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
+    WHERE ci.user_id = %s
+    """
+
+    @staticmethod
+    def _write(query: str, params: Tuple, tx=None, prepared: bool = True) -> int:
+        """
+        Run one cart write, inside tx when given
+
+        Returns:
+            int: Affected rows
+        """
+        if tx is not None:
+            tx.execute(query, params, prepared=prepared)
+            return tx.rowcount
+        return DatabaseConnection.execute_query(query, params, prepared=prepared)
+
+    @staticmethod
+    def items(user_id: int) -> list:
+        """
+        Fetch the cart contents of a user
+
+        Returns:
+            list: Cart rows with item, price, quantity and restaurant
+        """
+        return DatabaseConnection.execute_query(CartRepository.ITEMS, (user_id,), fetch=True, prepared=True)
+
+    @staticmethod
+    def add_item(user_id: int, menu_item_id: int, quantity: int = 1, tx=None) -> bool:
+        """
+        Add an item to the cart, or increase its quantity if it is already there
+
+        Args:
+            user_id (int): Cart owner
+            menu_item_id (int): Item to add
+            quantity (int, optional): Units to add
+            tx (Transaction, optional): Run inside this transaction
+
+        Returns:
+            bool: True if the item was new to the cart; SQLite does not
+                report the difference and always returns True
+        """
+        affected = CartRepository._write(
+            CartRepository.ADD_ITEM, (user_id, menu_item_id, quantity, quantity), tx
+        )
+        return affected == 1
+
+    @staticmethod
+    def add_items(user_id: int, items: Iterable[Tuple[int, int]], tx=None) -> int:
+        """
+        Add several items in multi-row upserts
+
+        Args:
+            user_id (int): Cart owner
+            items (iterable): (menu_item_id, quantity) pairs
+            tx (Transaction, optional): Run inside this transaction
+
+        Returns:
+            int: Affected rows as reported by the server
+        """
+        rows = [(user_id, menu_item_id, quantity) for menu_item_id, quantity in items]
+        if not rows:
+            return 0
+        if tx is not None:
+            return tx.execute_many(CartRepository.ADD_ITEMS, rows).rowcount
+        return DatabaseConnection.execute_many(CartRepository.ADD_ITEMS, rows).rowcount
+
+    @staticmethod
+    def add_order_items(user_id: int, order_id: int, tx=None) -> int:
+        """
+        Copy every item of a past order into the cart with one statement
+
+        Returns:
+            int: Affected rows as reported by the server
+        """
+        return CartRepository._write(CartRepository.ADD_ORDER_ITEMS, (user_id, order_id), tx)
+
+    @staticmethod
+    def change_quantity(cart_item_id: int, change: int, tx=None) -> Optional[int]:
+        """
+        Change the quantity of a cart row, deleting it once it reaches zero
+
+        Args:
+            cart_item_id (int): Cart row to change
+            change (int): Units to add, negative to remove
+            tx (Transaction, optional): Run inside this transaction
+
+        Returns:
+            int or None: 0 if the row was deleted, 1 if its quantity changed,
+                None if the row no longer exists
+        """
+        if change >= 0:
+            if CartRepository._write(CartRepository.INCREASE_QUANTITY, (change, cart_item_id), tx):
+                return 1
+            return None
+
+        amount = -change
+        # A concurrent change can slip in between the two statements; one
+        # more try settles it either way
+        for _ in range(2):
+            if CartRepository._write(CartRepository.DELETE_IF_EXHAUSTED, (cart_item_id, amount), tx):
+                return 0
+            if CartRepository._write(CartRepository.DECREASE_QUANTITY, (amount, cart_item_id, amount), tx):
+                return 1
+        return None
+
+    @staticmethod
+    def remove_item(cart_item_id: int, tx=None) -> bool:
+        """
+        Delete a cart row
+
+        Returns:
+            bool: True if the row existed
+        """
+        return CartRepository._write(CartRepository.REMOVE_ITEM, (cart_item_id,), tx) > 0
+
+    @staticmethod
+    def remove_items(user_id: int, menu_item_ids: Iterable[int], tx=None) -> int:
+        """
+        Delete several items from a user's cart with one statement
+
+        Returns:
+            int: Rows deleted
+        """
+        menu_item_ids = list(menu_item_ids)
+        if not menu_item_ids:
+            return 0
+        placeholders = ", ".join(["%s"] * len(menu_item_ids))
+        query = f"DELETE FROM CartItems WHERE user_id = %s AND menu_item_id IN ({placeholders})"
+        # The IN list varies in length, so it is not worth a prepared statement
+        return CartRepository._write(query, (user_id, *menu_item_ids), tx, prepared=False)
@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable database connections"""
+
+    def __init__(self, connect: Callable, min_size: int = 1, max_size: int = 5,
+                 max_idle_time: float = 300.0, checkout_timeout: float = 10.0,
+                 ping_interval: float = 30.0):
+        """
+        Initialize the pool
+
+        Args:
+            connect (callable): Factory returning a new open connection
+            min_size (int): Connections kept open even when idle
+            max_size (int): Upper bound on open connections
+            max_idle_time (float): Seconds an idle connection above min_size may live
+            checkout_timeout (float): Seconds to wait for a free connection
+            ping_interval (float): Idle seconds after which a connection is
+                checked for liveness before being handed out
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._size = 0  # Open connections, idle or checked out
+        self._closed = False
+
+        # Metrics
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self):
+        """Open a new connection and account for it"""
+        connection = self._connect()
+        with self._lock:
+            self._size += 1
+            self._created += 1
+        return connection
+
+    def _close_quietly(self, connection):
+        """Close a connection, ignoring errors from an already dead socket"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, connection) -> bool:
+        """Check that a connection still talks to the server"""
+        try:
+            return connection.is_connected()
+        except Exception:
+            return False
+
+    def _reap_idle_locked(self):
+        """Close idle connections above min_size that exceeded max_idle_time"""
+        now = time.monotonic()
+        reaped = []
+        while len(self._idle) and self._size - len(reaped) > self.min_size:
+            connection, last_used = self._idle[0]
+            if now - last_used < self.max_idle_time:
+                break
+            self._idle.popleft()
+            reaped.append(connection)
+
+        self._size -= len(reaped)
+        self._discarded += len(reaped)
+        return reaped
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Check a connection out of the pool
+
+        Args:
+            timeout (float, optional): Seconds to wait, defaults to checkout_timeout
+
+        Returns:
+            A live connection that must be handed back with release()
+
+        Raises:
+            PoolTimeoutError: If the pool stays exhausted for the whole timeout
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+
+                reaped = self._reap_idle_locked()
+                candidate = None
+                may_open = False
+
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._lock.wait(remaining)
+
+                if self._idle:
+                    candidate, last_used = self._idle.pop()
+                else:
+                    # Reserve the slot before connecting outside the lock
+                    self._size += 1
+                    may_open = True
+
+            for connection in reaped:
+                self._close_quietly(connection)
+
+            if may_open:
+                try:
+                    candidate = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._created += 1
+            elif time.monotonic() - last_used >= self.ping_interval and not self._is_alive(candidate):
+                # Stale connection, drop it and try again
+                self._discard(candidate)
+                continue
+
+            wait_time = time.monotonic() - started
+            with self._lock:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._total_wait += wait_time
+                self._max_wait = max(self._max_wait, wait_time)
+            return candidate
+
+    def release(self, connection, discard: bool = False):
+        """
+        Return a connection to the pool
+
+        Args:
+            connection: Connection previously obtained from acquire()
+            discard (bool): Close the connection instead of reusing it
+        """
+        if not discard:
+            try:
+                # Never hand a half-finished transaction to the next caller
+                if getattr(connection, "in_transaction", False):
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard or self._closed:
+            self._discard(connection)
+            return
+
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            reaped = self._reap_idle_locked()
+            self._lock.notify()
+
+        for stale in reaped:
+            self._close_quietly(stale)
+
+    def _discard(self, connection):
+        """Close a checked-out connection and free its slot"""
+        self._close_quietly(connection)
+        with self._lock:
+            self._size -= 1
+            self._discarded += 1
+            self._lock.notify()
+
+    def reap_idle(self):
+        """Close idle connections that outlived max_idle_time"""
+        with self._lock:
+            reaped = self._reap_idle_locked()
+        for connection in reaped:
+            self._close_quietly(connection)
+        return len(reaped)
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for connection in idle:
+            self._close_quietly(connection)
+
+    @property
+    def in_use(self) -> int:
+        """Connections currently checked out"""
+        return self._size - len(self._idle)
+
+    def stats(self) -> dict:
+        """
+        Snapshot of pool usage and wait-time metrics
+
+        Returns:
+            dict: Sizes, checkout counters and wait times in seconds
+        """
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "total_wait": self._total_wait,
+                "avg_wait": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "max_wait": self._max_wait,
+            }
@@ -0,0 +1,413 @@
+"""
+Generate large, realistic data sets for benchmarking
+
+The same seed and volumes, loaded into the same starting database, always
+produce the same rows; order dates count back from a fixed moment (--now),
+not the clock. Popularity is
+skewed the way real traffic is: a few restaurants and users account for
+most orders, menus vary in length and recent days have more orders.
+
+    python data_generator.py --preset large
+    python data_generator.py --restaurants 5000 --orders 200000 --seed 7
+    python data_generator.py --backend sqlite --sqlite-path bench.db --preset medium
+    python data_generator.py --now "2025-06-01 12:00:00"
+
+Rows are appended to the database the app is configured for (see
+db_backends.DB_CONFIG) after applying pending migrations, so it can be run
+again to grow a data set. Run it on its own: ids are derived from the first
+id of each multi-row INSERT.
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Optional
+from db_backends import DB_CONFIG, get_backend
+from db_connection import DEFAULT_BATCH_SIZE, bulk_execute
+from migrations import migrate
+from order_status import OrderStatus
+from password_utility import PasswordManager
+
+# Volumes per preset: restaurants, menu items, users, orders
+PRESETS = {
+    "small": (1_000, 20_000, 10_000, 100_000),
+    "medium": (10_000, 200_000, 100_000, 1_000_000),
+    "large": (100_000, 2_000_000, 1_000_000, 10_000_000),
+}
+
+# Rows generated and committed per transaction
+CHUNK_SIZE = 10_000
+
+# Zipf exponents; higher concentrates more traffic on the top entries
+RESTAURANT_SKEW = 1.1
+USER_SKEW = 0.8
+
+# Timestamps are passed as text, which both backends parse the same way
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Default moment the order history leads up to; fixed so a seed always
+# produces the same dates
+GENERATION_EPOCH = datetime(2025, 1, 1, 12, 0, 0)
+
+# Password of every generated user
+GENERATED_PASSWORD = "password123"
+
+ADJECTIVES = ["Golden", "Spicy", "Happy", "Royal", "Urban", "Rustic", "Little", "Blue",
+              "Green", "Lucky", "Crispy", "Smoky", "Fresh", "Hungry", "Sunny", "Silver"]
+NOUNS = ["Spoon", "Kitchen", "Wok", "Oven", "Grill", "Garden", "Table", "Bistro",
+         "Diner", "Corner", "Palace", "House", "Express", "Street", "Harbor", "Leaf"]
+DISHES = ["Pizza", "Burger", "Curry", "Noodles", "Fried Rice", "Salad", "Wrap", "Tacos",
+          "Biryani", "Dumplings", "Pasta", "Soup", "Sandwich", "Cake", "Pie", "Smoothie",
+          "Masala", "Ramen", "Sushi Roll", "Kebab"]
+DISH_STYLES = ["Classic", "Spicy", "Grilled", "Crispy", "Veggie", "Chicken", "Paneer",
+               "Double", "Garlic", "Cheesy", "Smoked", "House", "Tandoori", "Sweet"]
+MENU_SECTIONS = ["Starters", "Mains", "Sides", "Desserts", "Drinks", "Specials"]
+DESCRIPTION_WORDS = ["fresh", "homemade", "authentic", "organic", "crispy", "creamy",
+                     "spicy", "tangy", "slow-cooked", "wood-fired", "seasonal", "local"]
+FIRST_NAMES = ["Alex", "Sam", "Priya", "Chen", "Maria", "Omar", "Lena", "Ravi", "Yuki",
+               "Noah", "Ava", "Liam", "Zara", "Ivan", "Mei", "Tom"]
+LAST_NAMES = ["Smith", "Patel", "Wang", "Garcia", "Khan", "Muller", "Sato", "Brown",
+              "Silva", "Kim", "Nguyen", "Cohen", "Ali", "Rossi", "Jones", "Singh"]
+STREETS = ["Main St", "Elm St", "Oak Rd", "Park Ave", "High St", "Lake Dr", "Hill Rd", "Bay St"]
+
+RESTAURANT_INSERT = """INSERT INTO Restaurants
+(restaurant_name, description, category_id, rating, delivery_time, address, contact_number)
+VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+
+MENU_ITEM_INSERT = """INSERT INTO MenuItems
+(restaurant_id, item_name, description, price, category, is_vegetarian, is_available)
+VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+
+USER_INSERT = """INSERT INTO Users
+(first_name, last_name, email, password, phone_number, address)
+VALUES (%s, %s, %s, %s, %s, %s)"""
+
+ORDER_INSERT = """INSERT INTO Orders
+(user_id, restaurant_id, total_amount, order_date, status, estimated_delivery_time, delivery_address)
+VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+
+ORDER_ITEM_INSERT = """INSERT INTO OrderItems
+(order_id, menu_item_id, quantity, item_price)
+VALUES (%s, %s, %s, %s)"""
+
+def zipf_weights(count: int, skew: float) -> list:
+    """Cumulative Zipf weights for random.choices: rank r is picked in proportion to 1 / r**skew"""
+    return list(accumulate(1.0 / rank ** skew for rank in range(1, count + 1)))
+
+class DataGenerator:
+    """Bulk-loads seeded synthetic restaurants, menus, users and orders"""
+
+    def __init__(self, seed: int = 42, batch_size: int = DEFAULT_BATCH_SIZE, days: int = 365,
+                 now: Optional[datetime] = None):
+        """
+        Initialize the generator
+
+        Args:
+            seed (int): Seed of the random generator; same seed, same rows
+            batch_size (int): Rows per multi-row INSERT
+            days (int): Orders are spread over this many days before now
+            now (datetime, optional): Moment the order history leads up to,
+                GENERATION_EPOCH by default
+        """
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.days = days
+        self.now = (now or GENERATION_EPOCH).replace(microsecond=0)
+        self.user_offset = 0  # Users already in the database, keeps emails unique across runs
+        self.backend = get_backend()
+        self.connection = None
+        self.cursor = None
+
+        # Filled as tables are generated; later tables reference them
+        self.category_ids = []
+        self.restaurant_ids = []
+        self.menu_first_ids = array("q")  # First menu item id of each restaurant
+        self.menu_prices = {}  # First menu item id -> prices of that menu
+        self.user_ids = []
+
+        # Popularity order and cumulative Zipf weights for picking orders
+        self.restaurant_by_rank = []
+        self.restaurant_weights = []
+        self.user_by_rank = []
+        self.user_weights = []
+
+    def connect(self):
+        """Open a connection tuned for bulk loading"""
+        # Each chunk runs in its own explicit transaction
+        self.connection = self.backend.connect()
+        self.cursor = self.connection.cursor()
+        if self.backend.name == "mysql":
+            # The generated rows are consistent, so skip per-row checks
+            self.cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        else:
+            self.cursor.execute("PRAGMA synchronous = OFF")
+
+    def analyze(self):
+        """Refresh optimizer statistics so query plans reflect the new volumes"""
+        print("Analyzing tables...")
+        if self.backend.name == "mysql":
+            self.cursor.execute("ANALYZE TABLE Restaurants, MenuItems, Users, Orders, OrderItems")
+            self.cursor.fetchall()
+        else:
+            self.cursor.execute("ANALYZE")
+
+    def close(self):
+        """Close the connection"""
+        self.cursor.close()
+        self.connection.close()
+
+    def insert(self, query: str, rows: list) -> list:
+        """
+        Insert rows in multi-row batches
+
+        Returns:
+            list: Ids of the inserted rows, in order
+        """
+        result = bulk_execute(self.cursor, query, rows, self.batch_size)
+        ids = []
+        for index, first_id in enumerate(result.first_ids):
+            batch_rows = min(self.batch_size, len(rows) - index * self.batch_size)
+            ids.extend(range(first_id, first_id + batch_rows))
+        return ids
+
+    def load(self, table: str, total: int, make_chunk):
+        """
+        Generate and insert a table chunk by chunk, committing each chunk
+
+        Args:
+            table (str): Name for progress output
+            total (int): Rows to generate
+            make_chunk (callable): Called with (start, count), inserts that
+                many rows
+        """
+        started = time.perf_counter()
+        for start in range(0, total, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, total - start)
+            self.connection.start_transaction()
+            make_chunk(start, count)
+            self.connection.commit()
+            elapsed = time.perf_counter() - started
+            print(f"\r{table}: {start + count:,}/{total:,} ({(start + count) / elapsed:,.0f} rows/s)",
+                  end="", flush=True)
+        print()
+
+    def load_categories(self):
+        """Use the categories the migrations created"""
+        self.cursor.execute("SELECT category_id FROM Categories ORDER BY category_id")
+        self.category_ids = [row[0] for row in self.cursor.fetchall()]
+        if not self.category_ids:
+            raise RuntimeError("No categories found; run the migrations with sample data first")
+
+    def restaurant_chunk(self, start: int, count: int):
+        """Restaurants with ratings clustered around 4.2 and a few large categories"""
+        rng = self.rng
+        category_weights = zipf_weights(len(self.category_ids), 1.0)
+        rows = []
+        for number in range(start, start + count):
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {number + 1}"
+            description = f"{rng.choice(DESCRIPTION_WORDS).capitalize()} {rng.choice(DISHES).lower()} and more"
+            rating = round(min(5.0, max(1.0, rng.gauss(4.2, 0.4))), 1)
+            rows.append((
+                name,
+                description,
+                rng.choices(self.category_ids, cum_weights=category_weights)[0],
+                rating,
+                rng.randint(15, 60),
+                f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+                f"555-{rng.randint(0, 9999):04d}",
+            ))
+        self.restaurant_ids.extend(self.insert(RESTAURANT_INSERT, rows))
+
+    def menu_sizes(self, total: int) -> list:
+        """Split the menu items between restaurants, lognormally, at least 3 each"""
+        restaurants = len(self.restaurant_ids)
+        raw = [self.rng.lognormvariate(0, 0.6) for _ in range(restaurants)]
+        scale = max(0, total - 3 * restaurants) / sum(raw)
+        sizes = [3 + int(value * scale) for value in raw]
+        # Hand out what rounding left over
+        for index in range(total - sum(sizes)):
+            sizes[index % restaurants] += 1
+        return sizes
+
+    def load_menu_items(self, total: int):
+        """Menus of every restaurant, generated restaurant by restaurant"""
+        sizes = self.menu_sizes(total)
+        rng = self.rng
+        pending = []
+        pending_owners = []
+
+        def flush():
+            self.connection.start_transaction()
+            ids = self.insert(MENU_ITEM_INSERT, pending)
+            position = 0
+            for index, size in pending_owners:
+                self.menu_first_ids[index] = ids[position]
+                self.menu_prices[ids[position]] = [row[3] for row in pending[position:position + size]]
+                position += size
+            self.connection.commit()
+            pending.clear()
+            pending_owners.clear()
+
+        self.menu_first_ids = array("q", [0] * len(self.restaurant_ids))
+        started = time.perf_counter()
+        done = 0
+        for index, (restaurant_id, size) in enumerate(zip(self.restaurant_ids, sizes)):
+            for _ in range(size):
+                style = rng.choice(DISH_STYLES)
+                pending.append((
+                    restaurant_id,
+                    f"{style} {rng.choice(DISHES)}",
+                    f"{rng.choice(DESCRIPTION_WORDS).capitalize()} and {rng.choice(DESCRIPTION_WORDS)}",
+                    round(rng.uniform(3, 30), 2),
+                    rng.choice(MENU_SECTIONS),
+                    style in ("Veggie", "Paneer") or rng.random() < 0.3,
+                    rng.random() < 0.95,
+                ))
+            pending_owners.append((index, size))
+            done += size
+            if len(pending) >= CHUNK_SIZE:
+                flush()
+                print(f"\rMenuItems: {done:,}/{total:,} ({done / (time.perf_counter() - started):,.0f} rows/s)",
+                      end="", flush=True)
+        if pending:
+            flush()
+        print(f"\rMenuItems: {done:,}/{total:,}")
+
+    def user_chunk(self, start: int, count: int):
+        """Users with emails unique per seed and run"""
+        rng = self.rng
+        password = PasswordManager.hash_password(GENERATED_PASSWORD)
+        rows = []
+        for number in range(start, start + count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            rows.append((
+                first,
+                last,
+                f"{first.lower()}.{last.lower()}.{self.seed}.{self.user_offset + number}@example.com",
+                password,
+                f"{rng.randint(1000000000, 9999999999)}",
+                f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            ))
+        self.user_ids.extend(self.insert(USER_INSERT, rows))
+
+    def order_chunk(self, start: int, count: int):
+        """Orders and their items; popular restaurants and heavy users dominate"""
+        rng = self.rng
+        restaurant_picks = rng.choices(self.restaurant_by_rank, cum_weights=self.restaurant_weights, k=count)
+        user_picks = rng.choices(self.user_by_rank, cum_weights=self.user_weights, k=count)
+
+        orders = []
+        order_items = []  # Per order: [(menu_item_id, quantity, price)]
+        for restaurant_index, user_id in zip(restaurant_picks, user_picks):
+            first_id = self.menu_first_ids[restaurant_index]
+            prices = self.menu_prices[first_id]
+            items = []
+            for offset in rng.sample(range(len(prices)), min(len(prices), rng.choice((1, 1, 2, 2, 3, 4)))):
+                items.append((first_id + offset, rng.choice((1, 1, 1, 2, 3)), prices[offset]))
+            total = round(sum(quantity * price for _, quantity, price in items), 2)
+
+            # Recent days are busier; the last couple of hours are still in progress
+            age = timedelta(seconds=int(86400 * min(self.days, rng.expovariate(3.0 / self.days))))
+            order_date = self.now - age
+            if age < timedelta(hours=2):
+                status = rng.choice((OrderStatus.PLACED, OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY))
+            else:
+                status = OrderStatus.DELIVERED
+            orders.append((
+                user_id,
+                self.restaurant_ids[restaurant_index],
+                total,
+                order_date.strftime(TIMESTAMP_FORMAT),
+                int(status),
+                (order_date + timedelta(minutes=45)).strftime(TIMESTAMP_FORMAT),
+                f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            ))
+            order_items.append(items)
+
+        order_ids = self.insert(ORDER_INSERT, orders)
+        self.insert(ORDER_ITEM_INSERT, [
+            (order_id, menu_item_id, quantity, price)
+            for order_id, items in zip(order_ids, order_items)
+            for menu_item_id, quantity, price in items
+        ])
+
+    def generate(self, restaurants: int, menu_items: int, users: int, orders: int):
+        """
+        Generate every table
+
+        Args:
+            restaurants (int): Restaurants to add
+            menu_items (int): Menu items to add, spread over the new restaurants
+            users (int): Users to add
+            orders (int): Orders to add, each with 1 to 4 items
+        """
+        if restaurants < 1 or users < 1:
+            raise ValueError("Need at least one restaurant and one user")
+        menu_items = max(menu_items, 3 * restaurants)
+
+        self.connect()
+        try:
+            self.load_categories()
+            self.load("Restaurants", restaurants, self.restaurant_chunk)
+            self.load_menu_items(menu_items)
+            self.cursor.execute("SELECT COALESCE(MAX(user_id), 0) FROM Users")
+            self.user_offset = self.cursor.fetchone()[0]
+            self.load("Users", users, self.user_chunk)
+
+            # Rank restaurants and users randomly so popularity is not tied to id
+            self.restaurant_by_rank = list(range(len(self.restaurant_ids)))
+            self.rng.shuffle(self.restaurant_by_rank)
+            self.restaurant_weights = zipf_weights(len(self.restaurant_ids), RESTAURANT_SKEW)
+            self.user_by_rank = list(self.user_ids)
+            self.rng.shuffle(self.user_by_rank)
+            self.user_weights = zipf_weights(len(self.user_ids), USER_SKEW)
+            self.load("Orders", orders, self.order_chunk)
+            self.analyze()
+        except BaseException:
+            # Committed chunks stay; only the one in progress is discarded
+            self.connection.rollback()
+            raise
+        finally:
+            self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic data for benchmarking")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small",
+                        help="Volumes to start from; explicit counts override them")
+    parser.add_argument("--restaurants", type=int)
+    parser.add_argument("--menu-items", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=365, help="Days of order history")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=GENERATION_EPOCH,
+                        help="Moment the order history leads up to, e.g. '2025-06-01 12:00:00'")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per INSERT")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], help="Overrides FOOD_DB_BACKEND")
+    parser.add_argument("--sqlite-path", help="Overrides FOOD_DB_SQLITE_PATH")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        DB_CONFIG["backend"] = args.backend
+    if args.sqlite_path:
+        DB_CONFIG["sqlite_path"] = args.sqlite_path
+
+    restaurants, menu_items, users, orders = PRESETS[args.preset]
+    restaurants = args.restaurants if args.restaurants is not None else restaurants
+    menu_items = args.menu_items if args.menu_items is not None else menu_items
+    users = args.users if args.users is not None else users
+    orders = args.orders if args.orders is not None else orders
+
+    print(f"Schema version {migrate()}")
+    print(f"Generating {restaurants:,} restaurants, {menu_items:,} menu items, {users:,} users "
+          f"and {orders:,} orders with seed {args.seed}")
+    started = time.perf_counter()
+    DataGenerator(args.seed, args.batch_size, args.days, args.now).generate(restaurants, menu_items, users, orders)
+    print(f"Done in {time.perf_counter() - started:,.1f}s")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,532 @@
+import math
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError, IntegrityError as MySQLIntegrityError
+except ImportError:  # SQLite-only installs do not need the MySQL driver
+    mysql = None
+    MySQLError = MySQLIntegrityError = None
+
+# Database settings; every value can be overridden with an environment
+# variable so the same code runs against MySQL or an embedded SQLite file
+DB_CONFIG = {
+    "backend": os.environ.get("FOOD_DB_BACKEND", "mysql"),  # "mysql" or "sqlite"
+    "host": os.environ.get("FOOD_DB_HOST", "localhost"),
+    "port": int(os.environ.get("FOOD_DB_PORT", "3306")),
+    "user": os.environ.get("FOOD_DB_USER", "root"),
+    "password": os.environ.get("FOOD_DB_PASSWORD", "new_password"),
+    "database": os.environ.get("FOOD_DB_NAME", "food_system"),
+    "sqlite_path": os.environ.get("FOOD_DB_SQLITE_PATH", "food_system.db"),
+    # Read replicas as "host[:port],host[:port]"; empty sends every query to the primary
+    "replicas": os.environ.get("FOOD_DB_REPLICAS", ""),
+    # Replicas further behind the primary than this many seconds get no reads
+    "max_replica_lag": float(os.environ.get("FOOD_DB_MAX_REPLICA_LAG", "5")),
+    # Seconds a read may run, and a write may wait for row locks, before
+    # failing with QueryTimeoutError; 0 means no limit
+    "read_timeout": float(os.environ.get("FOOD_DB_READ_TIMEOUT", "10")),
+    "lock_wait_timeout": float(os.environ.get("FOOD_DB_LOCK_WAIT_TIMEOUT", "5")),
+}
+
+# Start of a statement that can carry a MAX_EXECUTION_TIME hint
+_SELECT_START = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+# MySQL errors for an exceeded MAX_EXECUTION_TIME and lock wait timeout
+_MYSQL_TIMEOUT_ERRORS = (3024, 1205)
+
+# Exception classes raised by whichever drivers are installed
+DatabaseError = tuple(cls for cls in (MySQLError, sqlite3.Error) if cls is not None)
+IntegrityError = tuple(cls for cls in (MySQLIntegrityError, sqlite3.IntegrityError) if cls is not None)
+
+class MySQLBackend:
+    """Connections to a MySQL server"""
+
+    name = "mysql"
+    # Server-side prepared statements via cursor(prepared=True)
+    supports_prepared = True
+
+    def connect(self, database=True, autocommit=True, host=None, port=None):
+        """
+        Open a MySQL connection
+
+        Args:
+            database (bool): Select the configured database; False connects to
+                the server only, e.g. to create the database
+            autocommit (bool): Commit each statement on its own
+            host (str, optional): Server to use instead of the primary, e.g. a replica
+            port (int, optional): Port to use with host
+
+        Returns:
+            mysql.connector.connection: A database connection object
+        """
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is not installed; set FOOD_DB_BACKEND=sqlite "
+                               "to use the embedded database")
+
+        settings = {
+            "host": host or DB_CONFIG["host"],
+            "port": port or DB_CONFIG["port"],
+            "user": DB_CONFIG["user"],
+            "password": DB_CONFIG["password"],
+            "autocommit": autocommit,
+        }
+        if database:
+            settings["database"] = DB_CONFIG["database"]
+        connection = mysql.connector.connect(**settings)
+        self.set_lock_wait_timeout(connection, DB_CONFIG["lock_wait_timeout"])
+        return connection
+
+    def set_lock_wait_timeout(self, connection, timeout):
+        """
+        Limit how long the connection's writes wait for row locks
+
+        Args:
+            connection: Open MySQL connection
+            timeout (float): Seconds, rounded up; 0 waits as long as MySQL allows
+        """
+        seconds = max(1, math.ceil(timeout)) if timeout else 1073741824
+        if getattr(connection, "_lock_wait_timeout", None) == seconds:
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SET SESSION innodb_lock_wait_timeout = {seconds}")
+        finally:
+            cursor.close()
+        connection._lock_wait_timeout = seconds
+
+    def begin_statement(self, connection, query, timeout, read):
+        """
+        Apply a timeout to the next statement
+
+        Reads get a MAX_EXECUTION_TIME optimizer hint, which costs nothing
+        extra; writes get the session lock wait timeout.
+
+        Args:
+            connection: Connection the statement runs on
+            query (str): Statement to run
+            timeout (float): Seconds, 0 for no limit
+            read (bool): Whether the statement only reads
+
+        Returns:
+            str: Statement to execute instead of query
+        """
+        if not read:
+            self.set_lock_wait_timeout(connection, timeout)
+            return query
+        if timeout and "/*+" not in query and _SELECT_START.match(query):
+            hint = f"/*+ MAX_EXECUTION_TIME({max(1, int(timeout * 1000))}) */"
+            return _SELECT_START.sub(lambda m: f"{m.group(0)} {hint}", query, count=1)
+        return query
+
+    def end_statement(self, connection):
+        """Nothing to undo; the hint only applied to its statement"""
+
+    def cancel(self, connection):
+        """
+        Stop the statement running on a connection with KILL QUERY
+
+        The connection itself stays open and usable.
+        """
+        killer = self.connect(database=False, host=connection.server_host, port=connection.server_port)
+        try:
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(connection.connection_id)}")
+            cursor.close()
+        finally:
+            killer.close()
+
+    def is_timeout(self, error):
+        """Whether an error means a statement timeout or lock wait timeout"""
+        return getattr(error, "errno", None) in _MYSQL_TIMEOUT_ERRORS
+
+    def replica_addresses(self):
+        """
+        Parse DB_CONFIG['replicas']
+
+        Returns:
+            list: (host, port) pairs of the configured read replicas
+        """
+        addresses = []
+        for entry in DB_CONFIG["replicas"].split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            host, _, port = entry.partition(":")
+            addresses.append((host, int(port) if port else DB_CONFIG["port"]))
+        return addresses
+
+    def replication_lag(self, connection):
+        """
+        Seconds a replica is behind its source
+
+        Returns:
+            float or None: Lag in seconds, 0.0 for a server that is not
+                replicating, None if replication is stopped or broken
+        """
+        cursor = connection.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+                column = "Seconds_Behind_Source"
+            except MySQLError:
+                # Servers before 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+                column = "Seconds_Behind_Master"
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        if not rows:
+            return 0.0
+        lag = rows[0].get(column)
+        return None if lag is None else float(lag)
+
+    def index_exists(self, cursor, table, name):
+        """Whether a table in the current database has an index of this name"""
+        cursor.execute(
+            """SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1""",
+            (table, name)
+        )
+        return bool(cursor.fetchall())
+
+    def full_scans(self, cursor, query, params=None):
+        """
+        Tables a query reads row by row without an index, according to EXPLAIN
+
+        The optimizer prefers full scans of tables it knows are tiny, so run
+        this against a realistically sized database.
+
+        Returns:
+            list: Table names or aliases with access type ALL
+        """
+        cursor.execute(f"EXPLAIN {query}", params or ())
+        columns = cursor.column_names
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return [step["table"] for step in plan if step.get("type") == "ALL"]
+
+class SQLiteBackend:
+    """In-process SQLite database file, translating the app's MySQL dialect"""
+
+    name = "sqlite"
+    # sqlite3 already reuses compiled statements per connection
+    supports_prepared = False
+
+    def connect(self, database=True, autocommit=True):
+        """
+        Open the SQLite database file
+
+        Args:
+            database (bool): Ignored, the file is the database
+            autocommit (bool): Commit each statement on its own
+
+        Returns:
+            SQLiteConnection: Connection with the mysql.connector interface used by the app
+        """
+        return SQLiteConnection(DB_CONFIG["sqlite_path"], autocommit=autocommit)
+
+    def replica_addresses(self):
+        """SQLite has no replicas; every query uses the database file"""
+        return []
+
+    def begin_statement(self, connection, query, timeout, read):
+        """
+        Apply a timeout to the next statement
+
+        Reads get a deadline checked by the progress handler; writes get the
+        busy timeout, SQLite's equivalent of a lock wait timeout.
+
+        Returns:
+            str: The unchanged query
+        """
+        connection.set_timeout(timeout, read)
+        return query
+
+    def end_statement(self, connection):
+        """Clear the read deadline"""
+        connection.deadline = None
+
+    def cancel(self, connection):
+        """Stop the statement running on a connection"""
+        connection.raw.interrupt()
+
+    def is_timeout(self, error):
+        """Whether an error means a missed deadline or a busy database"""
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ("interrupted" in message or "locked" in message)
+
+    def index_exists(self, cursor, table, name):
+        """Whether a table has an index of this name"""
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+            (table, name)
+        )
+        return bool(cursor.fetchall())
+
+    def full_scans(self, cursor, query, params=None):
+        """
+        Tables a query reads row by row without an index, according to
+        EXPLAIN QUERY PLAN
+
+        Returns:
+            list: Table names or aliases SQLite scans without an index
+        """
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params or ())
+        scans = []
+        for row in cursor.fetchall():
+            # e.g. 'SCAN r', 'SCAN TABLE Orders AS o', 'SCAN r USING INDEX idx'
+            words = row[-1].split()
+            if words[0] != "SCAN" or "USING" in words or words[1] in ("CONSTANT", "SUBQUERY"):
+                continue
+            scans.append(words[-1] if "AS" in words else words[2] if words[1] == "TABLE" else words[1])
+        return scans
+
+BACKENDS = {
+    MySQLBackend.name: MySQLBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+_backend = None
+
+def get_backend():
+    """
+    Get the backend selected by DB_CONFIG['backend']
+
+    Returns:
+        MySQLBackend or SQLiteBackend: Backend instance
+    """
+    global _backend
+    name = DB_CONFIG["backend"].lower()
+    if _backend is None or _backend.name != name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown database backend '{name}', expected one of {sorted(BACKENDS)}")
+        _backend = BACKENDS[name]()
+    return _backend
+
+# ---------------- SQLite dialect translation ----------------
+
+_INTERVAL_UNITS = {
+    "SECOND": "seconds", "MINUTE": "minutes", "HOUR": "hours",
+    "DAY": "days", "MONTH": "months", "YEAR": "years",
+}
+
+# VALUES(column) inside ON DUPLICATE KEY UPDATE, i.e. the value the INSERT tried to write
+_INSERTED_VALUE = re.compile(r"\bVALUES\s*\(\s*([A-Za-z_]\w*)\s*\)", re.IGNORECASE)
+# Table-qualified assignment target, e.g. "CartItems.quantity =", which MySQL
+# needs in INSERT ... SELECT but SQLite's DO UPDATE SET rejects
+_QUALIFIED_TARGET = re.compile(r"\b[A-Za-z_]\w*\.([A-Za-z_]\w*)(\s*=)(?!=)")
+_SKIPPED_STATEMENTS = re.compile(r"^\s*(CREATE\s+DATABASE|USE\s)", re.IGNORECASE)
+_TRANSLATIONS = [
+    # Placeholders
+    (re.compile(r"%s"), "?"),
+    # DDL
+    (re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"(\w+)\s+ENUM\s*\(([^)]*)\)", re.IGNORECASE), r"\1 TEXT CHECK (\1 IN (\2))"),
+    (re.compile(r"\bUNIQUE\s+KEY\s+\w+\s*\(", re.IGNORECASE), "UNIQUE ("),
+    (re.compile(r"\)\s*ENGINE\s*=\s*\w+[^;]*$", re.IGNORECASE), ")"),
+    (re.compile(r"\bDROP\s+INDEX\s+(\w+)\s+ON\s+\w+", re.IGNORECASE), r"DROP INDEX \1"),
+    # DML
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+    (re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.IGNORECASE | re.DOTALL),
+     lambda m: "ON CONFLICT DO UPDATE SET" + _QUALIFIED_TARGET.sub(
+         r"\1\2", _INSERTED_VALUE.sub(r"excluded.\1", m.group(1)))),
+    (re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE), ""),
+    (re.compile(r"\bGREATEST\s*\(", re.IGNORECASE), "MAX("),
+    (re.compile(r"\bLEAST\s*\(", re.IGNORECASE), "MIN("),
+    (re.compile(r"\bNOW\s*\(\s*\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\bDATE_ADD\s*\(\s*([^,]+?)\s*,\s*INTERVAL\s+(-?\d+)\s+(\w+?)S?\s*\)", re.IGNORECASE),
+     lambda m: f"datetime({m.group(1)}, '{int(m.group(2)):+d} {_INTERVAL_UNITS[m.group(3).upper()]}')"),
+]
+
+@lru_cache(maxsize=1024)
+def translate_sql(query: str):
+    """
+    Rewrite a MySQL statement used by the app into SQLite syntax
+
+    Args:
+        query (str): Statement written for MySQL with %s placeholders
+
+    Returns:
+        str or None: SQLite statement, or None if it has no SQLite equivalent
+            and can be skipped (CREATE DATABASE, USE)
+    """
+    if _SKIPPED_STATEMENTS.match(query):
+        return None
+    for pattern, replacement in _TRANSLATIONS:
+        query = pattern.sub(replacement, query.rstrip())
+    return query
+
+def _parse_timestamp(value: bytes):
+    """Convert a stored TIMESTAMP back to datetime like the MySQL driver does"""
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("TIMESTAMP", _parse_timestamp)
+sqlite3.register_converter("DATETIME", _parse_timestamp)
+
+class SQLiteCursor:
+    """Cursor exposing the subset of the mysql.connector cursor API the app uses"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+        self._lastrowid = None
+        self._skipped = False
+
+    @property
+    def column_names(self):
+        description = self._cursor.description or ()
+        return tuple(column[0] for column in description)
+
+    @property
+    def rowcount(self):
+        return -1 if self._skipped else self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._lastrowid
+
+    def execute(self, query, params=None):
+        statement = translate_sql(query)
+        self._skipped = statement is None
+        if self._skipped:
+            return
+        self._cursor.execute(statement, tuple(params) if params else ())
+
+        # Match MySQL: a multi-row INSERT reports the id of its first row
+        lastrowid = self._cursor.lastrowid
+        rowcount = self._cursor.rowcount
+        if lastrowid and rowcount > 1 and statement.lstrip()[:6].upper() in ("INSERT", "REPLAC"):
+            lastrowid -= rowcount - 1
+        self._lastrowid = lastrowid
+
+    def executemany(self, query, seq_params):
+        statement = translate_sql(query)
+        self._skipped = statement is None
+        if not self._skipped:
+            self._cursor.executemany(statement, [tuple(params) for params in seq_params])
+            self._lastrowid = self._cursor.lastrowid
+
+    def _convert(self, rows):
+        if not self._dictionary:
+            return rows
+        columns = self.column_names
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchone(self):
+        if self._skipped:
+            return None
+        row = self._cursor.fetchone()
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchmany(self, size=1):
+        return [] if self._skipped else self._convert(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return [] if self._skipped else self._convert(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """sqlite3 connection with the subset of the mysql.connector API the app uses"""
+
+    def __init__(self, path, autocommit=True):
+        """
+        Open the database file
+
+        Args:
+            path (str): Database file, created if missing
+            autocommit (bool): Commit each statement unless a transaction is open
+        """
+        self.path = path
+        self.autocommit = autocommit
+        self.deadline = None  # time.monotonic() after which the running read is interrupted
+        self.busy_timeout = DB_CONFIG["lock_wait_timeout"]
+        # Pooled connections move between threads but are used by one at a time
+        self.raw = sqlite3.connect(
+            path,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=self.busy_timeout or 2 ** 31 / 1000
+        )
+        # Checked every 1000 virtual machine instructions
+        self.raw.set_progress_handler(self._past_deadline, 1000)
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        # WAL lets the page processes read while another one writes
+        self.raw.execute("PRAGMA journal_mode = WAL")
+        self._closed = False
+        if not autocommit:
+            self.start_transaction()
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def _past_deadline(self):
+        """Progress handler; a non-zero return interrupts the statement"""
+        return int(self.deadline is not None and time.monotonic() > self.deadline)
+
+    def set_timeout(self, timeout, read):
+        """
+        Limit the next statement
+
+        Args:
+            timeout (float): Seconds, 0 for no limit
+            read (bool): Limit running time for reads, lock waiting for writes
+        """
+        if read:
+            self.deadline = time.monotonic() + timeout if timeout else None
+        elif timeout != self.busy_timeout:
+            milliseconds = int(timeout * 1000) if timeout else 2 ** 31 - 1
+            self.raw.execute(f"PRAGMA busy_timeout = {milliseconds}")
+            self.busy_timeout = timeout
+
+    def cursor(self, dictionary=False, buffered=True, prepared=False):
+        """Create a cursor; buffered and prepared are accepted for API compatibility"""
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def start_transaction(self):
+        """Begin a transaction that holds the write lock, like SELECT ... FOR UPDATE would"""
+        self.raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+        if not self.autocommit:
+            self.start_transaction()
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+        if not self.autocommit:
+            self.start_transaction()
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        try:
+            self.raw.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.raw.close()
@@ -1,67 +1,863 @@
-import mysql.connector
-from mysql.connector import Error
-from typing import Optional, Tuple
+import atexit
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from cancellation import CancelToken, QueryCancelledError, QueryTimeoutError
+from connection_pool import ConnectionPool
+from db_backends import DB_CONFIG, DatabaseError as Error, get_backend
+from query_cache import QueryCache, is_write, tables_in
+from query_stats import QueryStats, attributed_to, call_site
+from replica_router import Replica, ReplicaRouter
+from statement_cache import StatementCache
+from row_factories import ROW_DICT, build_rows, check_row_factory
+
+# Connection pool settings, see DatabaseConnection.configure_pool
+POOL_SETTINGS = {
+    "min_size": 1,
+    "max_size": 5,
+    "max_idle_time": 300.0,
+    "checkout_timeout": 10.0,
+    "ping_interval": 30.0,
+}
+
+# Rows per multi-row INSERT issued by execute_many
+DEFAULT_BATCH_SIZE = 1000
+
+# Rows pulled from the server per round trip by stream_query
+DEFAULT_CHUNK_SIZE = 1000
+
+# Results of execute_query(cache_ttl=...) calls; writes made through this
+# module invalidate the tables they touch. The cache is per process, so
+# writes from other page processes only show up once the TTL expires.
+query_cache = QueryCache()
+
+# Per-statement latency, rows and pool wait; statements slower than
+# FOOD_DB_SLOW_QUERY_MS go to a rotating log. Set FOOD_DB_STATS_FILE to
+# append a snapshot at exit.
+query_stats = QueryStats(slow_threshold=float(os.environ.get("FOOD_DB_SLOW_QUERY_MS", "200")) / 1000)
+
+# Server-side prepared statements for execute_query(prepared=True), kept
+# per pooled connection and closed least recently used first
+statement_cache = StatementCache(max_statements=int(os.environ.get("FOOD_DB_PREPARED_STATEMENTS", "64")))
+
+_VALUES_PATTERN = re.compile(r"\bVALUES\s*\(", re.IGNORECASE)
+
+class BulkResult(NamedTuple):
+    """Outcome of a batched statement"""
+    rowcount: int  # Rows affected across all batches
+    batches: int  # Statements sent to the server
+    first_ids: List[int]  # AUTO_INCREMENT id of the first row of each INSERT batch
+
+def _split_values_clause(query: str):
+    """
+    Split an INSERT into the text before its row tuple, the tuple and the rest
+
+    Returns:
+        tuple or None: (prefix, row_template, suffix), None if query has no VALUES (...)
+    """
+    match = _VALUES_PATTERN.search(query)
+    if not match or not query.lstrip()[:7].upper().startswith(("INSERT", "REPLACE")):
+        return None
+
+    start = match.end() - 1
+    depth = 0
+    for index in range(start, len(query)):
+        if query[index] == "(":
+            depth += 1
+        elif query[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return query[:start], query[start:index + 1], query[index + 1:]
+    return None
+
+def bulk_execute(cursor, query: str, rows: Iterable[Sequence],
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> BulkResult:
+    """
+    Execute a parameterised statement for many rows in batches
+
+    INSERT/REPLACE ... VALUES (...) statements are rewritten into one
+    multi-row statement per batch; anything else goes through executemany.
+    Rows are consumed lazily, so a generator of millions of rows is fine.
+
+    Args:
+        cursor: Open cursor to execute on
+        query (str): Statement with one row of %s placeholders
+        rows (iterable): Parameter tuples, one per row
+        batch_size (int): Rows per statement
+
+    Returns:
+        BulkResult: Affected rows, statements sent and first id per batch
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    parts = _split_values_clause(query)
+    rows = iter(rows)
+    rowcount = 0
+    batches = 0
+    first_ids = []
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        if parts:
+            prefix, row_template, suffix = parts
+            statement = prefix + ", ".join([row_template] * len(batch)) + suffix
+            cursor.execute(statement, tuple(value for row in batch for value in row))
+            # MySQL reports the id of the first row of a multi-row INSERT
+            if cursor.lastrowid:
+                first_ids.append(cursor.lastrowid)
+        else:
+            cursor.executemany(query, batch)
+
+        rowcount += max(cursor.rowcount, 0)
+        batches += 1
+
+    return BulkResult(rowcount, batches, first_ids)
+
+def _row_count(results) -> int:
+    """Number of rows in a fetched result of any row_factory"""
+    if isinstance(results, dict):
+        return len(next(iter(results.values()), ()))
+    return len(results)
+
+class Transaction:
+    """Unit of work running several statements on one pooled connection"""
+
+    def __init__(self, connection):
+        """
+        Initialize the transaction
+
+        Args:
+            connection: Pooled connection with an open transaction
+        """
+        self.connection = connection
+        self.cursor = connection.cursor(dictionary=True)
+        self._tuple_cursor = None
+        self.rowcount = 0
+        self.lastrowid = None
+        self.written_tables = set()
+        # Pool wait is charged to the first statement of the transaction
+        self.acquire_time = 0.0
+
+    def _take_acquire_time(self) -> float:
+        """Return the pending pool wait time once"""
+        acquire_time, self.acquire_time = self.acquire_time, 0.0
+        return acquire_time
+
+    def execute(self, query: str, params: Optional[Tuple] = None, fetch: bool = False,
+                row_factory: str = ROW_DICT, prepared: bool = False):
+        """
+        Execute a statement inside the transaction
+
+        Args:
+            query (str): SQL query to execute
+            params (tuple, optional): Query parameters
+            fetch (bool, optional): Whether to fetch results
+            row_factory (str, optional): Row representation, see row_factories
+            prepared (bool, optional): Use the connection's cached server-side
+                prepared statement, see DatabaseConnection.execute_query
+
+        Returns:
+            list or None: Query results if fetch is True
+        """
+        check_row_factory(row_factory)
+        if is_write(query):
+            self.written_tables.update(tables_in(query))
+
+        prepared = prepared and get_backend().supports_prepared
+        cursor = self.cursor
+        if prepared:
+            cursor = statement_cache.cursor(self.connection, query)
+        elif row_factory != ROW_DICT:
+            if self._tuple_cursor is None:
+                self._tuple_cursor = self.connection.cursor()
+            cursor = self._tuple_cursor
+
+        started = time.perf_counter()
+        rows = 0
+        failed = True
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            self.rowcount = cursor.rowcount
+            self.lastrowid = cursor.lastrowid
+
+            results = None
+            if fetch:
+                results = cursor.fetchall()
+                # Prepared cursors always return tuples
+                if prepared or row_factory != ROW_DICT:
+                    results = build_rows(results, cursor.column_names, row_factory)
+                rows = _row_count(results)
+            else:
+                rows = cursor.rowcount
+            failed = False
+            return results
+        except Error:
+            if prepared:
+                statement_cache.discard(self.connection, query)
+            raise
+        finally:
+            query_stats.record(query, time.perf_counter() - started, rows,
+                               self._take_acquire_time(), error=failed)
+
+    def close(self):
+        """Close the cursors used by the transaction"""
+        self.cursor.close()
+        if self._tuple_cursor is not None:
+            self._tuple_cursor.close()
+
+    def execute_many(self, query: str, rows: Iterable[Sequence],
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> BulkResult:
+        """
+        Execute a statement for many rows inside the transaction
+
+        Args:
+            query (str): Statement with one row of %s placeholders
+            rows (iterable): Parameter tuples, one per row
+            batch_size (int): Rows per multi-row statement
+
+        Returns:
+            BulkResult: Affected rows, statements sent and first id per batch
+        """
+        self.written_tables.update(tables_in(query))
+        started = time.perf_counter()
+        result = None
+        try:
+            result = bulk_execute(self.cursor, query, rows, batch_size)
+        finally:
+            query_stats.record(query, time.perf_counter() - started,
+                               result.rowcount if result else 0,
+                               self._take_acquire_time(), error=result is None)
+        self.rowcount = result.rowcount
+        self.lastrowid = self.cursor.lastrowid
+        return result
 
 class DatabaseConnection:
     """Utility class for managing database connections"""
-    
+
+    _pool = None
+    _router = None
+    _batch_executor = None
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def get_connection():
         """
-        Establish a connection to the MySQL database
-        
+        Establish a connection to the configured database
+
+        The backend (MySQL server or embedded SQLite file) and its settings
+        come from db_backends.DB_CONFIG, see FOOD_DB_BACKEND.
+
         Returns:
-            mysql.connector.connection: A database connection object
-        
+            Connection object with the mysql.connector interface
+
         Raises:
             Error: If connection fails
         """
+        backend = get_backend()
         try:
-            connection = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="new_password",
-                database="food_system"
-            )
-            return connection
+            # Each statement commits on its own; multi-statement work
+            # opens an explicit transaction instead
+            return backend.connect(autocommit=True)
         except Error as e:
-            print(f"Error connecting to MySQL Platform: {e}")
+            print(f"Error connecting to {backend.name} database: {e}")
             raise
 
     @staticmethod
-    def execute_query(query: str, params: Optional[Tuple] = None, fetch: bool = False):
+    def configure_pool(**settings):
+        """
+        Change pool settings, replacing the current pool if one exists
+
+        Args:
+            **settings: Any of min_size, max_size, max_idle_time,
+                checkout_timeout, ping_interval
+        """
+        unknown = set(settings) - set(POOL_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown pool settings: {', '.join(sorted(unknown))}")
+
+        with DatabaseConnection._pool_lock:
+            POOL_SETTINGS.update(settings)
+            old_pool, DatabaseConnection._pool = DatabaseConnection._pool, None
+            old_router, DatabaseConnection._router = DatabaseConnection._router, None
+        if old_pool:
+            old_pool.close()
+        if old_router:
+            old_router.close()
+
+    @staticmethod
+    def get_pool() -> ConnectionPool:
+        """
+        Get the process-wide connection pool, creating it on first use
+
+        Returns:
+            ConnectionPool: The shared pool
+        """
+        if DatabaseConnection._pool is None:
+            with DatabaseConnection._pool_lock:
+                if DatabaseConnection._pool is None:
+                    DatabaseConnection._pool = ConnectionPool(
+                        DatabaseConnection.get_connection,
+                        **POOL_SETTINGS
+                    )
+        return DatabaseConnection._pool
+
+    @staticmethod
+    def get_router() -> ReplicaRouter:
+        """
+        Get the read replica router, creating it on first use
+
+        Replicas come from FOOD_DB_REPLICAS and get their own pools with the
+        primary's POOL_SETTINGS. Without replicas every read uses the primary.
+
+        Returns:
+            ReplicaRouter: The shared router
+        """
+        if DatabaseConnection._router is None:
+            with DatabaseConnection._pool_lock:
+                if DatabaseConnection._router is None:
+                    backend = get_backend()
+                    replicas = []
+                    for host, port in backend.replica_addresses():
+                        # Connect lazily so a replica that is down cannot block startup
+                        pool = ConnectionPool(
+                            partial(backend.connect, autocommit=True, host=host, port=port),
+                            **dict(POOL_SETTINGS, min_size=0)
+                        )
+                        replicas.append(Replica(f"{host}:{port}", pool))
+                    DatabaseConnection._router = ReplicaRouter(
+                        replicas,
+                        lag_probe=getattr(backend, "replication_lag", None),
+                        max_lag=DB_CONFIG["max_replica_lag"]
+                    )
+        return DatabaseConnection._router
+
+    @staticmethod
+    def _acquire(read: bool = False):
+        """
+        Check out a connection, from a replica if the read can use one
+
+        Args:
+            read (bool): The statement only reads and may see slightly old data
+
+        Returns:
+            tuple: (pool, connection, replica); replica is None for the primary
+        """
+        if read:
+            router = DatabaseConnection.get_router()
+            replica = router.choose()
+            if replica is not None:
+                try:
+                    return replica.pool, replica.pool.acquire(), replica
+                except Exception as e:
+                    router.mark_failed(replica, e)
+
+        pool = DatabaseConnection.get_pool()
+        return pool, pool.acquire(), None
+
+    @staticmethod
+    def _note_write():
+        """Keep the session's next reads on the primary so they see the write"""
+        DatabaseConnection.get_router().note_write()
+
+    @staticmethod
+    def pool_stats() -> dict:
+        """
+        Get connection pool metrics
+
+        Returns:
+            dict: Pool sizes, checkout counts and wait times
+        """
+        return DatabaseConnection.get_pool().stats()
+
+    @staticmethod
+    def replica_stats() -> dict:
+        """
+        Get read routing metrics
+
+        Returns:
+            dict: Reads per replica, primary fallbacks, lag and health
+        """
+        return DatabaseConnection.get_router().stats()
+
+    @staticmethod
+    def prepared_statement_stats() -> dict:
+        """
+        Get prepared statement cache metrics
+
+        Returns:
+            dict: Statements held and hit/miss/eviction counters
+        """
+        return statement_cache.stats()
+
+    @staticmethod
+    def invalidate_cache(*tables):
+        """
+        Drop cached query results
+
+        Args:
+            *tables: Table names to invalidate; clears everything when omitted
+        """
+        if tables:
+            query_cache.invalidate_tables(tables)
+        else:
+            query_cache.clear()
+
+    @staticmethod
+    def statement_stats(limit: Optional[int] = None) -> list:
+        """
+        Aggregated per-statement statistics, most expensive first
+
+        Args:
+            limit (int, optional): Keep only the top statements
+
+        Returns:
+            list: Dicts with fingerprint, calls, latency, histogram, rows,
+                pool wait and the busiest call sites
+        """
+        snapshot = query_stats.snapshot()
+        return snapshot[:limit] if limit else snapshot
+
+    @staticmethod
+    def statement_stats_report(limit: int = 20) -> str:
+        """
+        Plain-text table of the most expensive statements
+
+        Args:
+            limit (int, optional): Statements to include
+
+        Returns:
+            str: Report suitable for printing
+        """
+        return query_stats.report(limit)
+
+    @staticmethod
+    def close_pool():
+        """Close all pooled connections"""
+        with DatabaseConnection._pool_lock:
+            pool, DatabaseConnection._pool = DatabaseConnection._pool, None
+            router, DatabaseConnection._router = DatabaseConnection._router, None
+        if pool:
+            pool.close()
+        if router:
+            router.close()
+
+    @staticmethod
+    @contextmanager
+    def transaction():
+        """
+        Run several statements as one unit of work on a single connection
+
+        Commits when the block finishes and rolls back if it raises.
+
+        Example:
+            with DatabaseConnection.transaction() as tx:
+                rows = tx.execute("SELECT ... FOR UPDATE", params, fetch=True)
+                tx.execute("UPDATE ...", params)
+
+        Yields:
+            Transaction: Handle used to execute statements
+        """
+        pool = DatabaseConnection.get_pool()
+        started = time.perf_counter()
+        connection = pool.acquire()
+        acquire_time = time.perf_counter() - started
+        transaction = None
+        broken = False
+        try:
+            connection.start_transaction()
+            transaction = Transaction(connection)
+            transaction.acquire_time = acquire_time
+            yield transaction
+            connection.commit()
+            if transaction.written_tables:
+                query_cache.invalidate_tables(transaction.written_tables)
+                DatabaseConnection._note_write()
+        except BaseException as e:
+            if isinstance(e, Error):
+                print(f"Database error: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                broken = True
+            raise
+        finally:
+            if transaction:
+                try:
+                    transaction.close()
+                except Error:
+                    broken = True
+            pool.release(connection, discard=broken)
+
+    @staticmethod
+    def execute_query(query: str, params: Optional[Tuple] = None, fetch: bool = False,
+                      row_factory: str = ROW_DICT, cache_ttl: Optional[float] = None,
+                      primary: bool = False, prepared: bool = False,
+                      timeout: Optional[float] = None, cancel: Optional[CancelToken] = None):
         """
         Execute a database query
-        
+
         Args:
             query (str): SQL query to execute
             params (tuple, optional): Query parameters
             fetch (bool, optional): Whether to fetch results
-        
+            row_factory (str, optional): Row representation for fetched
+                results: 'dict' (default), 'tuple', 'record' (compact
+                __slots__ rows that still support row['col'] and
+                row.get('col')) or 'columns' ({'col': [values...]})
+            cache_ttl (float, optional): Serve this read from the query cache
+                for up to cache_ttl seconds; None always hits the database
+            primary (bool, optional): Read from the primary even when replicas
+                are configured, for reads that must see the latest writes
+            prepared (bool, optional): Run as a server-side prepared statement
+                cached on the pooled connection, so repeated calls skip
+                parsing; meant for hot statements with fixed SQL text
+            timeout (float, optional): Seconds a read may run or a write may
+                wait for locks; defaults to DB_CONFIG read_timeout and
+                lock_wait_timeout, 0 means no limit
+            cancel (CancelToken, optional): Token another thread can use to
+                stop the statement, e.g. when its result is no longer wanted
+
         Returns:
-            list or None: Query results if fetch is True
+            list, dict or int: Query results if fetch is True, otherwise the
+                number of affected rows
+
+        Raises:
+            QueryTimeoutError: If the statement ran or waited too long
+            QueryCancelledError: If cancel was triggered
         """
+        check_row_factory(row_factory)
+        backend = get_backend()
+        writes = is_write(query)
+        prepared = prepared and backend.supports_prepared
+        if timeout is None:
+            timeout = DB_CONFIG["lock_wait_timeout"] if writes else DB_CONFIG["read_timeout"]
+        if cancel is not None:
+            cancel.check()
+
+        cache_key = None
+        if fetch and cache_ttl:
+            cache_key = QueryCache.make_key(query, params, row_factory)
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        pool = None
         connection = None
+        replica = None
+        cursor = None
+        statement = query
+        broken = False
+        retry_on_primary = False
+        acquire_time = 0.0
+        started = None
+        rows = 0
         try:
-            connection = DatabaseConnection.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
+            acquire_started = time.perf_counter()
+            pool, connection, replica = DatabaseConnection._acquire(
+                read=fetch and not writes and not primary
+            )
+            started = time.perf_counter()
+            acquire_time = started - acquire_started
+            if cancel is not None:
+                cancel.attach(backend, connection)
+            statement = backend.begin_statement(connection, query, timeout, read=not writes)
+            if prepared:
+                cursor = statement_cache.cursor(connection, statement)
+            else:
+                cursor = connection.cursor(dictionary=row_factory == ROW_DICT)
+
             if params:
-                cursor.execute(query, params)
+                cursor.execute(statement, params)
             else:
-                cursor.execute(query)
-            
+                cursor.execute(statement)
+
             if fetch:
                 results = cursor.fetchall()
+                # Prepared cursors always return tuples
+                if prepared or row_factory != ROW_DICT:
+                    results = build_rows(results, cursor.column_names, row_factory)
+                rows = _row_count(results)
+                query_stats.record(query, time.perf_counter() - started, rows, acquire_time)
+                if cache_key:
+                    query_cache.put(cache_key, results, cache_ttl)
+                if writes:
+                    DatabaseConnection._note_write()
                 return results
-            
-            connection.commit()
-            return None
-        
+
+            # Autocommit is on for pooled connections, so the write is
+            # already committed
+            rowcount = cursor.rowcount
+            query_stats.record(query, time.perf_counter() - started, rowcount, acquire_time)
+            query_cache.invalidate_for(query)
+            if writes:
+                DatabaseConnection._note_write()
+            return rowcount
+
         except Error as e:
+            if started is not None:
+                query_stats.record(query, time.perf_counter() - started, 0, acquire_time, error=True)
+            if cancel is not None and cancel.cancelled:
+                raise QueryCancelledError("Query cancelled") from e
+            if backend.is_timeout(e):
+                print(f"Query timed out after {timeout}s: {e}")
+                raise QueryTimeoutError(f"Query exceeded its {timeout}s timeout: {e}") from e
+
             print(f"Database error: {e}")
+            broken = connection is not None and not connection.is_connected()
+            if prepared and connection is not None:
+                statement_cache.discard(connection, None if broken else statement)
+            if replica is not None and broken:
+                # The replica went away mid-read; the primary can still answer
+                DatabaseConnection.get_router().mark_failed(replica, e)
+                retry_on_primary = True
+            else:
+                raise
+        finally:
+            if cancel is not None and connection is not None:
+                cancel.detach(connection)
+            if connection is not None:
+                try:
+                    backend.end_statement(connection)
+                except Error:
+                    broken = True
+            # Prepared cursors stay open in the statement cache
+            if cursor and not prepared:
+                try:
+                    cursor.close()
+                except Error:
+                    broken = True
+            if connection:
+                pool.release(connection, discard=broken)
+
+        if retry_on_primary:
+            return DatabaseConnection.execute_query(query, params, fetch, row_factory, cache_ttl,
+                                                    primary=True, prepared=prepared,
+                                                    timeout=timeout, cancel=cancel)
+
+    @staticmethod
+    def execute_batch(statements: Sequence, return_exceptions: bool = False) -> list:
+        """
+        Run independent read queries concurrently and return all result sets
+
+        Each statement runs on its own pooled connection, so the batch takes
+        about as long as its slowest query instead of the sum of all of them.
+        The first statement runs on the calling thread.
+
+        Example:
+            info, items = DatabaseConnection.execute_batch([
+                ("SELECT * FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,)),
+                ("SELECT * FROM MenuItems WHERE restaurant_id = %s", (restaurant_id,),
+                 {"row_factory": ROW_RECORD}),
+            ])
+
+        Args:
+            statements (sequence): Each a query string, (query, params) or
+                (query, params, options) where options are execute_query
+                keyword arguments such as row_factory or cache_ttl
+            return_exceptions (bool, optional): Put a failed statement's
+                exception in its result slot instead of raising it
+
+        Returns:
+            list: Fetched results in statement order
+        """
+        calls = []
+        for statement in statements:
+            if isinstance(statement, str):
+                statement = (statement,)
+            query, params, options = (tuple(statement) + (None, None))[:3]
+            calls.append((query, params, options or {}))
+
+        site = call_site()
+
+        def run(call):
+            query, params, options = call
+            with attributed_to(site):
+                return DatabaseConnection.execute_query(query, params, fetch=True, **options)
+
+        futures = []
+        if len(calls) > 1:
+            if DatabaseConnection._batch_executor is None:
+                with DatabaseConnection._pool_lock:
+                    if DatabaseConnection._batch_executor is None:
+                        DatabaseConnection._batch_executor = ThreadPoolExecutor(
+                            max_workers=POOL_SETTINGS["max_size"],
+                            thread_name_prefix="db-batch"
+                        )
+            futures = [DatabaseConnection._batch_executor.submit(run, call) for call in calls[1:]]
+
+        outcomes = []
+        if calls:
+            try:
+                outcomes.append(run(calls[0]))
+            except Exception as e:
+                outcomes.append(e)
+        for future in futures:
+            error = future.exception()
+            outcomes.append(future.result() if error is None else error)
+
+        if not return_exceptions:
+            # Every statement has finished, so no connection is left busy
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    raise outcome
+        return outcomes
+
+    @staticmethod
+    def stream_query(query: str, params: Optional[Tuple] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     row_factory: str = ROW_DICT, primary: bool = False) -> Iterator:
+        """
+        Iterate over a large result set without loading it into memory
+
+        Uses an unbuffered cursor and pulls chunk_size rows per fetchmany,
+        so memory stays flat however many rows match. The pooled connection
+        is held until the generator finishes or is closed; stopping early
+        discards that connection instead of draining the remaining rows.
+
+        Example:
+            with closing(DatabaseConnection.stream_query(query)) as rows:
+                for row in rows:
+                    ...
+
+        Args:
+            query (str): SQL query to execute
+            params (tuple, optional): Query parameters
+            chunk_size (int, optional): Rows fetched per round trip
+            row_factory (str, optional): 'dict', 'tuple' or 'record'
+            primary (bool, optional): Read from the primary even when replicas
+                are configured
+
+        Yields:
+            One row at a time in the requested representation
+        """
+        check_row_factory(row_factory, allow_columns=False)
+        acquire_started = time.perf_counter()
+        pool, connection, replica = DatabaseConnection._acquire(read=not primary)
+        started = time.perf_counter()
+        acquire_time = started - acquire_started
+        # Only time spent waiting on the server counts, not the consumer's work
+        db_time = 0.0
+        row_total = 0
+        cursor = None
+        exhausted = False
+        broken = False
+        failed = False
+        try:
+            cursor = connection.cursor(dictionary=row_factory == ROW_DICT, buffered=False)
+
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            db_time += time.perf_counter() - started
+
+            while True:
+                fetch_started = time.perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                db_time += time.perf_counter() - fetch_started
+                if not rows:
+                    break
+                row_total += len(rows)
+                if row_factory != ROW_DICT:
+                    rows = build_rows(rows, cursor.column_names, row_factory)
+                yield from rows
+
+            exhausted = True
+
+        except Error as e:
+            print(f"Database error: {e}")
+            failed = True
+            broken = not connection.is_connected()
+            if replica is not None and broken:
+                DatabaseConnection.get_router().mark_failed(replica, e)
+            raise
+        finally:
+            query_stats.record(query, db_time, row_total, acquire_time, error=failed)
+            # Unread rows are still on the wire; dropping the connection is
+            # far cheaper than reading millions of rows just to discard them
+            if not exhausted:
+                broken = True
+            if cursor and not broken:
+                try:
+                    cursor.close()
+                except Error:
+                    broken = True
+            pool.release(connection, discard=broken)
+
+    @staticmethod
+    def execute_many(query: str, rows: Iterable[Sequence],
+                     batch_size: int = DEFAULT_BATCH_SIZE, atomic: bool = True) -> BulkResult:
+        """
+        Execute a statement for many rows using multi-row batches
+
+        Args:
+            query (str): Statement with one row of %s placeholders, e.g.
+                "INSERT INTO OrderItems (order_id, menu_item_id) VALUES (%s, %s)"
+            rows (iterable): Parameter tuples, one per row
+            batch_size (int, optional): Rows per multi-row statement
+            atomic (bool, optional): Run every batch in one transaction; when
+                False each batch commits on its own, which suits huge loads
+
+        Returns:
+            BulkResult: Affected rows, statements sent and first id per batch
+        """
+        if atomic:
+            with DatabaseConnection.transaction() as tx:
+                return tx.execute_many(query, rows, batch_size)
+
+        pool = DatabaseConnection.get_pool()
+        acquire_started = time.perf_counter()
+        connection = pool.acquire()
+        started = time.perf_counter()
+        cursor = None
+        broken = False
+        result = None
+        try:
+            cursor = connection.cursor()
+            try:
+                result = bulk_execute(cursor, query, rows, batch_size)
+                return result
+            finally:
+                # Earlier batches are committed even if a later one fails
+                query_cache.invalidate_tables(tables_in(query))
+                DatabaseConnection._note_write()
+                query_stats.record(query, time.perf_counter() - started,
+                                   result.rowcount if result else 0,
+                                   started - acquire_started, error=result is None)
+        except Error as e:
+            print(f"Database error: {e}")
+            broken = not connection.is_connected()
             raise
         finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
\ No newline at end of file
+            if cursor:
+                try:
+                    cursor.close()
+                except Error:
+                    broken = True
+            pool.release(connection, discard=broken)
+
+def _dump_stats_at_exit():
+    """Append this process's query statistics to FOOD_DB_STATS_FILE, if set"""
+    path = os.environ.get("FOOD_DB_STATS_FILE")
+    if path and query_stats.snapshot():
+        try:
+            query_stats.dump(path)
+        except OSError as e:
+            print(f"Could not write query stats: {e}")
+
+atexit.register(DatabaseConnection.close_pool)
+atexit.register(_dump_stats_at_exit)
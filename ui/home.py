@@ -8,8 +8,31 @@ from PIL import Image
 
 # Database and utility imports
 from db_connection import DatabaseConnection
+from async_query import AsyncQueryRunner
+from row_factories import ROW_RECORD
+from pagination import RESTAURANTS_BY_RATING, fetch_page, watch_scroll_end
+from search import search
 from image_handler import ImageHandler
 
+# Seconds catalog reads may be served from the query cache
+CATALOG_CACHE_TTL = 300
+LISTING_CACHE_TTL = 60
+
+# Milliseconds of typing pause before the search runs
+SEARCH_DEBOUNCE_MS = 300
+
+# Restaurant cards fetched per page; a multiple of the 3 cards per row
+RESTAURANT_PAGE_SIZE = 12
+
+# Listing query; search and category filters add a WHERE condition and
+# pagination adds the seek condition, ORDER BY and LIMIT
+RESTAURANT_LISTING = """
+SELECT r.*, c.category_name 
+FROM Restaurants r
+JOIN Categories c ON r.category_id = c.category_id
+"""
+CATEGORY_FILTER = "r.category_id = %s"
+
 class HomePage:
     def __init__(self, user_id=None):
         # Configure CustomTkinter
@@ -22,12 +45,29 @@ class HomePage:
         self.root.geometry("1200x700")
         self.root.resizable(False, False)
 
-        # Store user ID and user details
+        # Runs searches and filters off the UI thread
+        self.query_runner = AsyncQueryRunner(self.root)
+
+        # Current restaurant listing: filter, cursor of the next page and
+        # whether that page is being fetched
+        self.listing_where = None
+        self.listing_params = ()
+        self.listing_cache_ttl = LISTING_CACHE_TTL
+        self.next_cursor = None
+        self.loading_more = False
+        self.load_more_button = None
+
+        # Pending search-as-you-type callback and the term last searched
+        self.search_after_id = None
+        self.last_search_term = ""
+
+        # Store user ID and fetch user details, categories and the first
+        # page of restaurants in one batch
         self.user_id = user_id
-        self.user_details = self.fetch_user_details()
+        self.user_details, self.categories, self.top_restaurants = self.fetch_page_data()
         
-        # Initialize image handler
-        self.image_handler = ImageHandler()
+        # Initialize image handler; card images load in the background
+        self.image_handler = ImageHandler(root=self.root)
         
         # Ensure image directories exist
         self.ensure_image_directories()
@@ -49,29 +89,48 @@ class HomePage:
                 os.makedirs(directory)
                 print(f"Created directory: {directory}")
 
-    def fetch_user_details(self):
+    def fetch_page_data(self):
         """
-        Fetch user details from the database
+        Fetch the data the page opens with in one batch
+
+        The user, category and restaurant queries run at the same time on
+        pooled connections, so opening the page costs the slowest query
+        instead of the sum of all three. A failed query leaves its
+        exception in place so the section that needs it can report it.
+
+        Returns:
+            tuple: (user details or None, categories, first restaurant Page)
         """
-        if not self.user_id:
-            return None
-        
-        try:
-            query = """
+        categories_query = "SELECT category_id, category_name FROM Categories"
+        restaurants_query, restaurants_params = RESTAURANTS_BY_RATING.query(
+            RESTAURANT_LISTING, page_size=RESTAURANT_PAGE_SIZE
+        )
+        statements = [
+            (categories_query, None, {"cache_ttl": CATALOG_CACHE_TTL}),
+            (restaurants_query, restaurants_params, {"row_factory": ROW_RECORD, "cache_ttl": LISTING_CACHE_TTL}),
+        ]
+        if self.user_id:
+            user_query = """
             SELECT user_id, first_name, last_name, email, phone_number 
             FROM Users 
             WHERE user_id = %s
             """
-            results = DatabaseConnection.execute_query(
-                query, 
-                params=(self.user_id,), 
-                fetch=True
-            )
-            
-            return results[0] if results else None
-        except Exception as e:
-            print(f"Error fetching user details: {e}")
-            return None
+            statements.append((user_query, (self.user_id,)))
+
+        print("Fetching page data from database...")
+        results = DatabaseConnection.execute_batch(statements, return_exceptions=True)
+        categories, restaurants = results[:2]
+        if not isinstance(restaurants, Exception):
+            restaurants = RESTAURANTS_BY_RATING.page(restaurants, RESTAURANT_PAGE_SIZE)
+
+        user_details = None
+        if len(results) > 2:
+            if isinstance(results[2], Exception):
+                print(f"Error fetching user details: {results[2]}")
+            elif results[2]:
+                user_details = results[2][0]
+
+        return user_details, categories, restaurants
 
     def setup_ui(self):
         # Main white background frame
@@ -139,47 +198,145 @@ class HomePage:
         
         # Add search functionality for Enter key
         self.search_entry.bind("<Return>", lambda event: self.perform_search())
+        # Search as the user types, once they pause
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+
+    def schedule_search(self, event=None):
+        """
+        Run the search shortly after the last keystroke
+
+        Each keystroke restarts the wait, and the search it finally runs
+        cancels any query still running for an earlier term
+        """
+        if event is not None and event.keysym == "Return":
+            return  # Handled by the <Return> binding
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.search_as_you_type)
+
+    def search_as_you_type(self):
+        """Search for the current term, or show all restaurants once it is cleared"""
+        self.search_after_id = None
+        search_term = self.search_entry.get().strip()
+        if search_term == self.last_search_term:
+            return  # Arrow keys, shift and the like
+        if search_term:
+            self.perform_search()
+        else:
+            self.last_search_term = ""
+            self.load_restaurants(on_error=self.on_search_error)
 
     def perform_search(self):
         """
         Perform search based on user input
         """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+
         search_term = self.search_entry.get().strip()
         if search_term:
-            try:
-                # Search for restaurants or dishes
-                query = """
-                SELECT r.*, c.category_name 
-                FROM Restaurants r
-                JOIN Categories c ON r.category_id = c.category_id
-                WHERE r.restaurant_name LIKE %s 
-                OR r.description LIKE %s 
-                OR c.category_name LIKE %s
-                """
-                search_param = f"%{search_term}%"
-                results = DatabaseConnection.execute_query(
-                    query, 
-                    params=(search_param, search_param, search_param), 
-                    fetch=True
-                )
-                
-                # Update restaurant listings
-                self.display_restaurants(results)
-            except Exception as e:
-                print(f"Search error: {e}")
-                # Show error message to user
-                self.show_error("Search Error", "Could not perform search.")
+            self.last_search_term = search_term
+            # Results are ranked by relevance in one list, no further pages
+            self.next_cursor = None
+            self.loading_more = False
+
+            # Search for restaurants or dishes
+            self.query_runner.submit(
+                search,
+                search_term,
+                key="restaurants",
+                cancellable=True,
+                on_success=self.show_search_results,
+                on_error=self.on_search_error
+            )
+
+    def show_search_results(self, results):
+        """
+        Show the restaurants matching a search, then the matching dishes
+
+        Args:
+            results (SearchResults): Restaurants and dishes, best match first
+        """
+        print(f"Found {len(results.restaurants)} restaurants and {len(results.dishes)} dishes")
+        self.display_restaurants(results.restaurants)
+        self.display_dishes(results.dishes)
+
+    def display_dishes(self, dishes):
+        """
+        List matching dishes below the restaurant cards, each opening its
+        restaurant's menu
+        """
+        if not dishes:
+            return
+
+        dishes_title = ctk.CTkLabel(
+            self.restaurants_frame,
+            text="Matching Dishes",
+            font=("Arial", 20, "bold"),
+            text_color="#2D3748",
+            anchor="w"
+        )
+        dishes_title.pack(fill="x", padx=10, pady=(20, 5))
+
+        for dish in dishes:
+            dish_row = ctk.CTkFrame(
+                self.restaurants_frame,
+                fg_color="white",
+                corner_radius=10,
+                border_width=1,
+                border_color="#E2E8F0"
+            )
+            dish_row.pack(fill="x", padx=10, pady=4)
+
+            dish_label = ctk.CTkLabel(
+                dish_row,
+                text=f"{dish['item_name']}  ·  {dish['restaurant_name']}",
+                font=("Arial", 14, "bold"),
+                text_color="#2D3748",
+                anchor="w"
+            )
+            dish_label.pack(side="left", padx=15, pady=10)
+
+            view_menu_btn = ctk.CTkButton(
+                dish_row,
+                text="View Menu",
+                font=("Arial", 12, "bold"),
+                fg_color="#32CD32",
+                text_color="white",
+                hover_color="#28A828",
+                corner_radius=10,
+                width=100,
+                height=30,
+                command=lambda d=dish: self.open_restaurant_menu(d)
+            )
+            view_menu_btn.pack(side="right", padx=15, pady=10)
+
+            price_label = ctk.CTkLabel(
+                dish_row,
+                text=f"${float(dish['price']):.2f}",
+                font=("Arial", 14),
+                text_color="#666666"
+            )
+            price_label.pack(side="right", padx=10)
+
+    def on_search_error(self, error):
+        """Report a failed search"""
+        print(f"Search error: {error}")
+        # Show error message to user
+        self.show_error("Search Error", "Could not perform search.")
 
     def setup_category_buttons(self):
         # Category buttons frame
         self.category_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         self.category_frame.pack(pady=(0, 20))
 
-        # Fetch categories from database
+        # Categories were fetched with the rest of the page data
         try:
-            query = "SELECT category_id, category_name FROM Categories"
-            categories = DatabaseConnection.execute_query(query, fetch=True)
-            
+            categories = self.categories
+            if isinstance(categories, Exception):
+                raise categories
+
             if not categories:
                 print("No categories found in database")
                 return
@@ -225,27 +382,111 @@ class HomePage:
         """
         Filter restaurants by category
         """
-        try:
-            print(f"Filtering restaurants by category ID: {category_id}")
-            query = """
-            SELECT r.*, c.category_name 
-            FROM Restaurants r
-            JOIN Categories c ON r.category_id = c.category_id
-            WHERE r.category_id = %s
-            """
-            results = DatabaseConnection.execute_query(
-                query, 
-                params=(category_id,), 
-                fetch=True
+        print(f"Filtering restaurants by category ID: {category_id}")
+
+        def show_failure(error):
+            print(f"Error filtering restaurants: {error}")
+            self.show_error("Filter Error", f"Could not filter restaurants: {error}")
+
+        self.load_restaurants(CATEGORY_FILTER, (category_id,), on_error=show_failure)
+
+    def load_restaurants(self, where=None, params=(), cache_ttl=LISTING_CACHE_TTL, on_error=None):
+        """
+        Replace the listing with the first page of restaurants matching a filter
+
+        Runs in the background; a newer search or filter supersedes it,
+        stopping its query if it is still running, and the listing is
+        updated on the UI thread when rows arrive
+        """
+        self.listing_where = where
+        self.listing_params = params
+        self.listing_cache_ttl = cache_ttl
+        self.next_cursor = None
+        self.loading_more = False
+
+        self.query_runner.submit(
+            fetch_page,
+            RESTAURANT_LISTING,
+            RESTAURANTS_BY_RATING,
+            where=where,
+            params=params,
+            page_size=RESTAURANT_PAGE_SIZE,
+            row_factory=ROW_RECORD,
+            cache_ttl=cache_ttl,
+            key="restaurants",
+            cancellable=True,
+            on_success=self.show_restaurant_page,
+            on_error=on_error
+        )
+
+    def load_more_restaurants(self):
+        """
+        Append the next page of the current listing
+
+        Called from the Load more button and when the listing is scrolled
+        near its end; ignored while a page is loading or after the last one
+        """
+        if not self.next_cursor or self.loading_more:
+            return
+        self.loading_more = True
+
+        def show_failure(error):
+            self.loading_more = False
+            print(f"Error loading more restaurants: {error}")
+
+        self.query_runner.submit(
+            fetch_page,
+            RESTAURANT_LISTING,
+            RESTAURANTS_BY_RATING,
+            where=self.listing_where,
+            params=self.listing_params,
+            cursor=self.next_cursor,
+            page_size=RESTAURANT_PAGE_SIZE,
+            row_factory=ROW_RECORD,
+            cache_ttl=self.listing_cache_ttl,
+            # Shares the key so a new search drops a page of the old listing
+            key="restaurants",
+            cancellable=True,
+            on_success=lambda page: self.show_restaurant_page(page, append=True),
+            on_error=show_failure
+        )
+
+    def show_restaurant_page(self, page, append=False):
+        """
+        Show a fetched page of restaurants
+
+        Args:
+            page (Page): Rows and cursor of the next page
+            append (bool): Add below the current cards instead of replacing them
+        """
+        print(f"Found {len(page.rows)} restaurants")
+        self.loading_more = False
+        self.next_cursor = page.next_cursor
+        if append:
+            self.append_restaurants(page.rows)
+        else:
+            self.display_restaurants(page.rows)
+        self.update_load_more_button()
+
+    def update_load_more_button(self):
+        """Keep a Load more button below the cards while more pages exist"""
+        if self.load_more_button is not None:
+            self.load_more_button.destroy()
+            self.load_more_button = None
+
+        if self.next_cursor:
+            self.load_more_button = ctk.CTkButton(
+                self.restaurants_frame,
+                text="Load more",
+                font=("Arial", 14),
+                width=160,
+                height=35,
+                corner_radius=15,
+                fg_color="#FF8866",
+                hover_color="#FF6644",
+                command=self.load_more_restaurants
             )
-            
-            print(f"Found {len(results)} restaurants for category {category_id}")
-            
-            # Update restaurant listings
-            self.display_restaurants(results)
-        except Exception as e:
-            print(f"Error filtering restaurants: {e}")
-            self.show_error("Filter Error", f"Could not filter restaurants: {e}")
+            self.load_more_button.pack(pady=10)
 
     def setup_restaurant_listings(self):
         """Setup the restaurant listings section with scrollable frame"""
@@ -272,22 +513,18 @@ class HomePage:
         self.restaurants_frame = ctk.CTkFrame(self.restaurants_container, fg_color="transparent")
         self.restaurants_frame.pack(fill="both", expand=True)
 
-        # Fetch restaurants from database
+        # Fetch the next page before the user reaches the bottom
+        watch_scroll_end(self.restaurants_container, self.load_more_restaurants)
+
+        # The first page was fetched with the rest of the page data
         try:
-            print("Fetching restaurants from database...")
-            query = """
-            SELECT r.*, c.category_name 
-            FROM Restaurants r
-            JOIN Categories c ON r.category_id = c.category_id
-            ORDER BY r.rating DESC
-            LIMIT 10
-            """
-            restaurants = DatabaseConnection.execute_query(query, fetch=True)
-            
-            if restaurants:
-                print(f"Found {len(restaurants)} restaurants")
+            page = self.top_restaurants
+            if isinstance(page, Exception):
+                raise page
+
+            if page.rows:
                 # Display restaurants
-                self.display_restaurants(restaurants)
+                self.show_restaurant_page(page)
             else:
                 print("No restaurants found in database")
                 no_restaurants_label = ctk.CTkLabel(
@@ -309,6 +546,7 @@ class HomePage:
         # Clear existing restaurants
         for widget in self.restaurants_frame.winfo_children():
             widget.destroy()
+        self.load_more_button = None
 
         # Display message if no restaurants found
         if not restaurants:
@@ -321,6 +559,12 @@ class HomePage:
             no_results_label.pack(pady=50)
             return
 
+        self.append_restaurants(restaurants)
+
+    def append_restaurants(self, restaurants):
+        """
+        Add restaurant cards below the ones already shown
+        """
         # Create a frame for each row (3 cards per row)
         row_frame = None
         
@@ -362,27 +606,21 @@ class HomePage:
         )
         img_frame.place(x=20, y=20)
         
-        # Get restaurant image
+        # Show the name until the restaurant image has loaded
+        img_label = ctk.CTkLabel(
+            img_frame,
+            text=restaurant.get('restaurant_name', 'Restaurant'),
+            font=("Arial", 20, "bold"),
+            text_color="#A0A0A0"
+        )
+        img_label.place(relx=0.5, rely=0.5, anchor="center")
+        
         restaurant_id = restaurant.get('restaurant_id')
-        restaurant_image = self.image_handler.get_restaurant_image(restaurant_id, size=(320, 170))
-        
-        if restaurant_image:
-            # Show actual image
-            img_label = ctk.CTkLabel(
-                img_frame,
-                image=restaurant_image,
-                text=""
-            )
-            img_label.place(relx=0.5, rely=0.5, anchor="center")
-        else:
-            # Fallback to text
-            img_label = ctk.CTkLabel(
-                img_frame,
-                text=restaurant.get('restaurant_name', 'Restaurant'),
-                font=("Arial", 20, "bold"),
-                text_color="#A0A0A0"
-            )
-            img_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.image_handler.get_restaurant_image(
+            restaurant_id,
+            size=(320, 170),
+            on_loaded=lambda image: self.show_card_image(img_label, image)
+        )
         
         # Restaurant name
         name_label = ctk.CTkLabel(
@@ -686,9 +924,16 @@ class HomePage:
             print(f"Error going to login: {e}")
             self.show_error("Error", f"Unable to open login page: {e}")
 
+    def show_card_image(self, label, image):
+        """Replace a card's placeholder text with its loaded image"""
+        if image and label.winfo_exists():
+            label.configure(image=image, text="")
+
     def run(self):
         """Run the home page application"""
         self.root.mainloop()
+        self.query_runner.shutdown()
+        self.image_handler.shutdown()
 
 def main():
     # Check if user ID is passed as command-line argument
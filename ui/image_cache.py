@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+
+# Bytes per pixel of the PIL modes the app decodes; others fall back to one
+# byte per band
+_MODE_BYTES = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4, "CMYK": 4,
+               "I": 4, "F": 4, "I;16": 2, "YCbCr": 3}
+
+_MISS = object()
+
+def image_bytes(image) -> int:
+    """Memory held by a decoded PIL image, from its dimensions and pixel format"""
+    width, height = image.size
+    return width * height * _MODE_BYTES.get(image.mode, len(image.getbands()))
+
+class ImageCache:
+    """LRU cache of decoded images bounded by an approximate memory budget"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes (int): Memory budget for the decoded pixels of cached
+                images; the least recently used ones are evicted beyond it
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (image, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def get(self, key, default=None):
+        """
+        Look up a cached image and mark it most recently used
+
+        Returns:
+            The cached image, or default if absent
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISS)
+            if entry is _MISS:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, image, size: int):
+        """
+        Store an image, evicting the least recently used ones to stay in budget
+
+        Args:
+            key: Cache key, e.g. (path, width, height)
+            image: Image object to cache
+            size (int): Bytes it holds, see image_bytes
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+
+            self._entries[key] = (image, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+                self.evicted_bytes += evicted_size
+
+    def discard(self, key):
+        """Forget one image, e.g. after its source file changed"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        """Drop all cached images"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Snapshot of cache usage
+
+        Returns:
+            dict: Entry count, bytes used and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
@@ -1,21 +1,55 @@
+import colorsys
 import os
+import threading
+import tkinter
+import zlib
 import customtkinter as ctk
-from PIL import Image, ImageOps
-import requests
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 from io import BytesIO
+from async_query import AsyncQueryRunner
+from image_cache import ImageCache, image_bytes
+from shared_image_cache import SHARED_IMAGE_CACHE_BYTES, SharedImageCache
+from thumbnails import THUMBNAIL_DIRECTORY, ensure_thumbnail
+
+# Memory budget of each page's decoded image cache
+IMAGE_CACHE_BYTES = int(float(os.environ.get("FOOD_IMAGE_CACHE_MB", "64")) * 1024 * 1024)
+
+# Threads decoding images for a page in the background
+IMAGE_WORKERS = 4
+
+# Missing images get a placeholder drawn locally. Set
+# FOOD_PLACEHOLDER_DOWNLOADS=1 to also fetch one from the placeholder
+# service in the background, replacing the drawn one for later page loads.
+PLACEHOLDER_DOWNLOADS = os.environ.get("FOOD_PLACEHOLDER_DOWNLOADS", "0") == "1"
+PLACEHOLDER_URL = "https://via.placeholder.com/{width}x{height}.png/CCCCCC/666666?text={text}"
+# Seconds to wait for the placeholder service
+PLACEHOLDER_TIMEOUT = 3.0
 
 class ImageHandler:
     """Utility class for managing images in the Food Delivery App"""
     
-    def __init__(self, base_directory="images/"):
+    def __init__(self, base_directory="images/", cache_bytes=IMAGE_CACHE_BYTES, root=None,
+                 workers=IMAGE_WORKERS, shared_cache_bytes=SHARED_IMAGE_CACHE_BYTES):
         """
         Initialize the ImageHandler
         
         Args:
             base_directory (str): Base directory for image storage
+            cache_bytes (int): Memory budget for cached images
+            root: Tk root of the page; enables loading images in the background
+            workers (int): Threads decoding images in the background
+            shared_cache_bytes (int): Size of the pixel cache shared with the
+                other pages; 0 disables it
         """
         self.base_directory = base_directory
-        self.cache = {}  # Cache to avoid reloading the same images
+        self.cache = ImageCache(cache_bytes)  # Cache to avoid reloading the same images
+        # Pixels decoded by any page, so navigating does not decode them again
+        self.shared_cache = SharedImageCache.open(
+            SharedImageCache.cache_path(os.path.join(base_directory, THUMBNAIL_DIRECTORY), shared_cache_bytes),
+            shared_cache_bytes
+        )
+        self.loader = AsyncQueryRunner(root, max_workers=workers) if root is not None else None
+        self._waiting = {}  # cache key -> callbacks of the requests waiting for that image
         
         # Create image directories if they don't exist
         self._ensure_directories_exist()
@@ -45,41 +79,160 @@ class ImageHandler:
             CTkImage or None: The loaded image or None if it failed
         """
         # Check if image exists in cache
-        cache_key = f"{image_path}_{size[0]}_{size[1]}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cache_key = (image_path, size[0], size[1])
+        img = self.cache.get(cache_key)
+        if img is not None:
+            return img
         
         try:
-            # Try to load the image
-            img = ctk.CTkImage(
-                light_image=Image.open(image_path),
-                dark_image=Image.open(image_path),
-                size=size
-            )
-            # Cache the image
-            self.cache[cache_key] = img
-            return img
+            return self._make_image(cache_key, self._decode(image_path, size), size)
         except Exception as e:
             print(f"Error loading image {image_path}: {e}")
             return None
+
+    def get_image_async(self, image_path, size, on_loaded, placeholder_text=None):
+        """
+        Load an image on a background thread and hand it over on the Tk thread
+
+        Cached images are handed over right away. Requests for an image that
+        is already loading wait for the same decode. Without a root the image
+        is loaded synchronously.
+
+        Args:
+            image_path (str): Path to the image
+            size (tuple): Width and height for the image
+            on_loaded (callable): Receives the CTkImage, or None if it failed
+            placeholder_text (str, optional): Create a placeholder with this
+                text if the file does not exist
+        """
+        if self.loader is None:
+            self._ensure_image(image_path, placeholder_text, size)
+            on_loaded(self.get_image(image_path, size))
+            return
+
+        cache_key = (image_path, size[0], size[1])
+        img = self.cache.get(cache_key)
+        if img is not None:
+            on_loaded(img)
+            return
+
+        waiting = self._waiting.get(cache_key)
+        if waiting is not None:
+            waiting.append(on_loaded)
+            return
+        self._waiting[cache_key] = [on_loaded]
+
+        def deliver(source):
+            img = self._make_image(cache_key, source, size) if source is not None else None
+            for callback in self._waiting.pop(cache_key, []):
+                try:
+                    callback(img)
+                except tkinter.TclError as e:
+                    # The widget waiting for the image was destroyed meanwhile
+                    print(f"Discarded image for a closed view: {e}")
+
+        def fail(error):
+            print(f"Error loading image {image_path}: {error}")
+            deliver(None)
+
+        self.loader.submit(
+            self._load_source, image_path, placeholder_text, size,
+            on_success=deliver, on_error=fail
+        )
+
+    def _load_source(self, image_path, placeholder_text, size):
+        """Create a missing image's placeholder, then decode it; runs on a loader thread"""
+        self._ensure_image(image_path, placeholder_text, size)
+        return self._decode(image_path, size)
+
+    def _ensure_image(self, image_path, placeholder_text, size):
+        """Create a placeholder if an image file does not exist"""
+        if placeholder_text is not None and not os.path.exists(image_path):
+            self._create_placeholder(image_path, placeholder_text, size)
+
+    def _decode(self, image_path, size):
+        """
+        Read and decode an image at the size it is shown
+
+        Pixels another page decoded already come from the shared cache.
+        Otherwise the image's thumbnail for that size is decoded, created on
+        first use or when the source changed, instead of the full source.
+
+        Returns:
+            PIL.Image.Image: Fully loaded image
+        """
+        shared_key = (os.path.abspath(image_path), size[0], size[1])
+        if self.shared_cache is not None:
+            mtime_ns = os.stat(image_path).st_mtime_ns
+            source = self.shared_cache.get(shared_key, mtime_ns)
+            if source is not None:
+                return source
+
+        source = Image.open(ensure_thumbnail(self.base_directory, image_path, size))
+        source.load()
+        if self.shared_cache is not None:
+            self.shared_cache.put(shared_key, mtime_ns, source)
+        return source
+
+    def _make_image(self, cache_key, source, size):
+        """
+        Wrap a decoded image for display and cache it
+
+        Returns:
+            CTkImage: The image at the requested size
+        """
+        # The app has no dark theme images, so both modes share one decoded copy
+        img = ctk.CTkImage(
+            light_image=source,
+            dark_image=source,
+            size=size
+        )
+        # Count the source pixels and the displayed RGBA copy Tk keeps
+        self.cache.put(cache_key, img, image_bytes(source) + size[0] * size[1] * 4)
+        return img
+
+    def shutdown(self):
+        """Stop background loading; call when the page closes"""
+        if self.loader is not None:
+            self.loader.shutdown()
+        self._waiting.clear()
+    
+    def cache_stats(self):
+        """
+        Snapshot of image cache usage
+
+        Returns:
+            dict: Entry count, bytes used and hit/miss/eviction counters,
+                with this page's shared cache counters under "shared"
+        """
+        stats = self.cache.stats()
+        if self.shared_cache is not None:
+            stats["shared"] = self.shared_cache.stats()
+        return stats
     
-    def get_restaurant_image(self, restaurant_id, size=(300, 200)):
-        """Get a restaurant image by ID"""
+    def get_restaurant_image(self, restaurant_id, size=(300, 200), on_loaded=None):
+        """Get a restaurant image by ID; with on_loaded, load it in the background instead"""
         image_path = os.path.join(self.base_directory, "restaurants", f"restaurant_{restaurant_id}.png")
+        if on_loaded is not None:
+            self.get_image_async(image_path, size, on_loaded, f"Restaurant {restaurant_id}")
+            return None
         
-        # If image doesn't exist, download a placeholder
+        # If image doesn't exist, create a placeholder
         if not os.path.exists(image_path):
-            self._download_placeholder_image(image_path, f"Restaurant {restaurant_id}", size)
+            self._create_placeholder(image_path, f"Restaurant {restaurant_id}", size)
         
         return self.get_image(image_path, size)
     
-    def get_menu_item_image(self, menu_item_id, size=(100, 100)):
-        """Get a menu item image by ID"""
+    def get_menu_item_image(self, menu_item_id, size=(100, 100), on_loaded=None):
+        """Get a menu item image by ID; with on_loaded, load it in the background instead"""
         image_path = os.path.join(self.base_directory, "menu_items", f"item_{menu_item_id}.png")
+        if on_loaded is not None:
+            self.get_image_async(image_path, size, on_loaded, f"Food {menu_item_id}")
+            return None
         
-        # If image doesn't exist, download a placeholder
+        # If image doesn't exist, create a placeholder
         if not os.path.exists(image_path):
-            self._download_placeholder_image(image_path, f"Food {menu_item_id}", size)
+            self._create_placeholder(image_path, f"Food {menu_item_id}", size)
         
         return self.get_image(image_path, size)
     
@@ -87,54 +240,105 @@ class ImageHandler:
         """Get a category image by ID"""
         image_path = os.path.join(self.base_directory, "categories", f"category_{category_id}.png")
         
-        # If image doesn't exist, download a placeholder
+        # If image doesn't exist, create a placeholder
         if not os.path.exists(image_path):
-            self._download_placeholder_image(image_path, f"Category {category_id}", size)
+            self._create_placeholder(image_path, f"Category {category_id}", size)
         
         return self.get_image(image_path, size)
     
+    def _create_placeholder(self, save_path, text="Food", size=(100, 100)):
+        """
+        Create a placeholder image for a food item or restaurant
+
+        The placeholder is drawn locally, so a missing image never waits on
+        the network. With PLACEHOLDER_DOWNLOADS, one from the placeholder
+        service replaces it in the background.
+
+        Args:
+            save_path (str): Path to save the image
+            text (str): Text to display on the placeholder
+            size (tuple): Width and height for the image
+        """
+        self._create_local_placeholder(save_path, text, size)
+        if PLACEHOLDER_DOWNLOADS:
+            threading.Thread(
+                target=self._download_placeholder_image,
+                args=(save_path, text, size),
+                name="placeholder-download",
+                daemon=True
+            ).start()
+
     def _download_placeholder_image(self, save_path, text="Food", size=(100, 100)):
         """
-        Download a placeholder image for a food item or restaurant
-        
+        Download a placeholder image over the locally drawn one
+
+        Runs in the background; pages opened afterwards show the download.
+
         Args:
             save_path (str): Path to save the image
             text (str): Text to display on the placeholder
             size (tuple): Width and height for the image
         """
+        # Imported here so pages that never download do not pay for it
+        import requests
+
         try:
-            # Generate a placeholder image with text
-            # This approach uses placeholder.com but you can replace with any placeholder service
             width, height = size
-            url = f"https://via.placeholder.com/{width}x{height}.png/CCCCCC/666666?text={text.replace(' ', '+')}"
-            
-            response = requests.get(url)
-            if response.status_code == 200:
-                img = Image.open(BytesIO(response.content))
-                img.save(save_path)
-                print(f"Downloaded placeholder image to {save_path}")
-            else:
-                self._create_local_placeholder(save_path, text, size)
+            url = PLACEHOLDER_URL.format(width=width, height=height, text=text.replace(' ', '+'))
+            response = requests.get(url, timeout=PLACEHOLDER_TIMEOUT)
+            response.raise_for_status()
+            img = Image.open(BytesIO(response.content))
+            self._save_image(img, save_path)
+            print(f"Downloaded placeholder image to {save_path}")
         except Exception as e:
             print(f"Error downloading placeholder: {e}")
-            self._create_local_placeholder(save_path, text, size)
-    
+
     def _create_local_placeholder(self, save_path, text="Food", size=(100, 100)):
         """
-        Create a local placeholder image when online service fails
-        
+        Draw a placeholder image with its text on a colour picked from the text
+
+        The text names the restaurant, item or category by ID, so each one
+        keeps its own colour across runs.
+
         Args:
             save_path (str): Path to save the image
             text (str): Text to display on the placeholder
             size (tuple): Width and height for the image
         """
         try:
-            # Create a blank image with text
             width, height = size
-            img = Image.new('RGB', size, color=(204, 204, 204))
-            
-            # Save the image
-            img.save(save_path)
+            hue = (zlib.crc32(text.encode()) % 360) / 360
+            background = tuple(round(c * 255) for c in colorsys.hls_to_rgb(hue, 0.85, 0.5))
+            foreground = tuple(round(c * 255) for c in colorsys.hls_to_rgb(hue, 0.3, 0.5))
+            img = Image.new('RGB', size, color=background)
+
+            # Largest font that fits; small icons only show the ID
+            draw = ImageDraw.Draw(img)
+            for label in (text, text.split()[-1]):
+                font_size = max(height // 4, 8)
+                while True:
+                    font = ImageFont.load_default(size=font_size)
+                    left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+                    fits = right - left <= width * 0.9 and bottom - top <= height * 0.9
+                    if fits or font_size <= 8:
+                        break
+                    font_size -= 1
+                if fits:
+                    break
+            if fits:
+                draw.text(
+                    ((width - (right - left)) / 2 - left, (height - (bottom - top)) / 2 - top),
+                    label, fill=foreground, font=font
+                )
+
+            self._save_image(img, save_path)
             print(f"Created local placeholder image at {save_path}")
         except Exception as e:
-            print(f"Error creating local placeholder: {e}")
\ No newline at end of file
+            print(f"Error creating local placeholder: {e}")
+
+    def _save_image(self, img, save_path):
+        """Write an image under a temporary name and move it into place, so
+        other pages never read a partial file"""
+        temp_path = f"{save_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(temp_path, "PNG")
+        os.replace(temp_path, save_path)
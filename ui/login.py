@@ -34,7 +34,8 @@ def login_user():
         results = DatabaseConnection.execute_query(
             query, 
             params=(email, hashed_password), 
-            fetch=True
+            fetch=True,
+            prepared=True
         )
 
         if results:
@@ -4,8 +4,26 @@ import sys
 import os
 from PIL import Image
 from db_connection import DatabaseConnection
+from cart_repository import CartRepository
+from row_factories import ROW_RECORD
 from image_handler import ImageHandler
 
+# Seconds restaurant and menu data may be served from the query cache
+CATALOG_CACHE_TTL = 300
+
+RESTAURANT_INFO = """
+SELECT r.*, c.category_name 
+FROM Restaurants r
+JOIN Categories c ON r.category_id = c.category_id
+WHERE r.restaurant_id = %s
+"""
+
+MENU_ITEMS = """
+SELECT * FROM MenuItems 
+WHERE restaurant_id = %s 
+ORDER BY category, item_name
+"""
+
 class RestaurantMenuApp:
     def __init__(self, restaurant_id=None, user_id=None):
         # Configure CustomTkinter
@@ -22,62 +40,48 @@ class RestaurantMenuApp:
         self.restaurant_id = restaurant_id
         self.user_id = user_id
         
-        # Initialize image handler
-        self.image_handler = ImageHandler()
+        # Initialize image handler; menu item images load in the background
+        self.image_handler = ImageHandler(root=self.root)
         
-        # Fetch restaurant info
-        self.restaurant_info = self.fetch_restaurant_info()
-        
-        # Fetch menu items
-        self.menu_items = self.fetch_menu_items()
+        # Fetch restaurant info and menu items together
+        self.restaurant_info, self.menu_items = self.fetch_page_data()
 
         # Setup UI
         self.setup_ui()
 
-    def fetch_restaurant_info(self):
-        """Fetch restaurant details"""
-        if not self.restaurant_id:
-            return None
-            
-        try:
-            query = """
-            SELECT r.*, c.category_name 
-            FROM Restaurants r
-            JOIN Categories c ON r.category_id = c.category_id
-            WHERE r.restaurant_id = %s
-            """
-            results = DatabaseConnection.execute_query(
-                query, 
-                params=(self.restaurant_id,), 
-                fetch=True
-            )
-            
-            return results[0] if results else None
-        except Exception as e:
-            print(f"Error fetching restaurant info: {e}")
-            return None
+    def fetch_page_data(self):
+        """
+        Fetch restaurant details and its menu items in one batch
+
+        Both queries run at the same time on pooled connections, so the
+        page waits for the slower one instead of both in turn.
 
-    def fetch_menu_items(self):
-        """Fetch menu items for the restaurant"""
+        Returns:
+            tuple: (restaurant info or None, list of menu items)
+        """
         if not self.restaurant_id:
-            return []
-            
-        try:
-            query = """
-            SELECT * FROM MenuItems 
-            WHERE restaurant_id = %s 
-            ORDER BY category, item_name
-            """
-            results = DatabaseConnection.execute_query(
-                query, 
-                params=(self.restaurant_id,), 
-                fetch=True
-            )
-            
-            return results
-        except Exception as e:
-            print(f"Error fetching menu items: {e}")
-            return []
+            return None, []
+
+        options = {"row_factory": ROW_RECORD, "cache_ttl": CATALOG_CACHE_TTL}
+        info, menu_items = DatabaseConnection.execute_batch(
+            [
+                (RESTAURANT_INFO, (self.restaurant_id,), options),
+                (MENU_ITEMS, (self.restaurant_id,), options),
+            ],
+            return_exceptions=True
+        )
+
+        if isinstance(info, Exception):
+            print(f"Error fetching restaurant info: {info}")
+            info = None
+        else:
+            info = info[0] if info else None
+
+        if isinstance(menu_items, Exception):
+            print(f"Error fetching menu items: {menu_items}")
+            menu_items = []
+
+        return info, menu_items
 
     def setup_ui(self):
         """Setup the user interface"""
@@ -259,6 +263,11 @@ class RestaurantMenuApp:
                 # Create menu item card
                 self.create_menu_item_card(row_frame, item)
 
+    def show_card_image(self, label, image):
+        """Replace a card's placeholder text with its loaded image"""
+        if image and label.winfo_exists():
+            label.configure(image=image, text="")
+
     def create_menu_item_card(self, parent, item):
         """Create a menu item card with image"""
         # Card frame
@@ -284,23 +293,21 @@ class RestaurantMenuApp:
         )
         img_frame.place(x=15, y=30)
         
-        # Get food item image
-        menu_item_id = item.get('menu_item_id')
-        food_image = self.image_handler.get_menu_item_image(menu_item_id, size=(120, 120))
+        # Show the item name until the food image has loaded
+        img_label = ctk.CTkLabel(
+            img_frame,
+            text=item.get('item_name', 'Food Item')[:10],
+            font=("Arial", 12),
+            text_color="#9CA3AF"
+        )
+        img_label.place(relx=0.5, rely=0.5, anchor="center")
         
-        if food_image:
-            # Show actual image
-            img_label = ctk.CTkLabel(img_frame, image=food_image, text="")
-            img_label.place(relx=0.5, rely=0.5, anchor="center")
-        else:
-            # Fallback to text
-            img_label = ctk.CTkLabel(
-                img_frame,
-                text=item.get('item_name', 'Food Item')[:10],
-                font=("Arial", 12),
-                text_color="#9CA3AF"
-            )
-            img_label.place(relx=0.5, rely=0.5, anchor="center")
+        menu_item_id = item.get('menu_item_id')
+        self.image_handler.get_menu_item_image(
+            menu_item_id,
+            size=(120, 120),
+            on_loaded=lambda image: self.show_card_image(img_label, image)
+        )
         
         # Right side: Item details
         details_frame = ctk.CTkFrame(card, fg_color="transparent")
@@ -382,41 +389,11 @@ class RestaurantMenuApp:
             return
             
         try:
-            # Check if item already in cart
-            check_query = """
-            SELECT cart_item_id, quantity 
-            FROM CartItems 
-            WHERE user_id = %s AND menu_item_id = %s
-            """
-            existing_item = DatabaseConnection.execute_query(
-                check_query, 
-                params=(self.user_id, menu_item_id), 
-                fetch=True
-            )
-            
-            if existing_item:
-                # Update quantity if already in cart
-                update_query = """
-                UPDATE CartItems 
-                SET quantity = quantity + 1 
-                WHERE cart_item_id = %s
-                """
-                DatabaseConnection.execute_query(
-                    update_query, 
-                    params=(existing_item[0]['cart_item_id'],)
-                )
-                message = "Item quantity updated in cart!"
-            else:
-                # Insert new cart item
-                insert_query = """
-                INSERT INTO CartItems (user_id, menu_item_id, quantity) 
-                VALUES (%s, %s, 1)
-                """
-                DatabaseConnection.execute_query(
-                    insert_query, 
-                    params=(self.user_id, menu_item_id)
-                )
+            # One upsert: concurrent clicks each add one, nothing is lost
+            if CartRepository.add_item(self.user_id, menu_item_id):
                 message = "Item added to cart!"
+            else:
+                message = "Item quantity updated in cart!"
                 
             # Show success message
             self.show_success_message(message)
@@ -648,6 +625,7 @@ def main():
     # Create and run the menu page
     app = RestaurantMenuApp(restaurant_id, user_id)
     app.root.mainloop()
+    app.image_handler.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""Tables of the original setup script"""
+
+# Created in dependency order so foreign keys resolve
+TABLES = [
+    # Users Table
+    """
+    CREATE TABLE IF NOT EXISTS Users (
+        user_id INT AUTO_INCREMENT PRIMARY KEY,
+        first_name VARCHAR(50) NOT NULL,
+        last_name VARCHAR(50) NOT NULL,
+        email VARCHAR(100) UNIQUE NOT NULL,
+        password VARCHAR(64) NOT NULL,
+        phone_number VARCHAR(20),
+        address TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+
+    # Categories Table
+    """
+    CREATE TABLE IF NOT EXISTS Categories (
+        category_id INT AUTO_INCREMENT PRIMARY KEY,
+        category_name VARCHAR(50) NOT NULL UNIQUE,
+        description TEXT
+    )
+    """,
+
+    # Restaurants Table
+    """
+    CREATE TABLE IF NOT EXISTS Restaurants (
+        restaurant_id INT AUTO_INCREMENT PRIMARY KEY,
+        restaurant_name VARCHAR(100) NOT NULL,
+        description TEXT,
+        category_id INT,
+        rating DECIMAL(3,2) DEFAULT 0,
+        delivery_time INT,
+        address VARCHAR(255),
+        contact_number VARCHAR(20),
+        FOREIGN KEY (category_id) REFERENCES Categories(category_id)
+    )
+    """,
+
+    # Menu Items Table
+    """
+    CREATE TABLE IF NOT EXISTS MenuItems (
+        menu_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        restaurant_id INT,
+        item_name VARCHAR(100) NOT NULL,
+        description TEXT,
+        price DECIMAL(10,2) NOT NULL,
+        category VARCHAR(50),
+        is_vegetarian BOOLEAN DEFAULT FALSE,
+        is_available BOOLEAN DEFAULT TRUE,
+        FOREIGN KEY (restaurant_id) REFERENCES Restaurants(restaurant_id)
+    )
+    """,
+
+    # Orders Table - Fixed to allow NULL for estimated_delivery_time
+    """
+    CREATE TABLE IF NOT EXISTS Orders (
+        order_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT,
+        restaurant_id INT,
+        total_amount DECIMAL(10, 2) NOT NULL,
+        order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status ENUM('Placed', 'Preparing', 'Out for Delivery', 'Delivered') DEFAULT 'Placed',
+        estimated_delivery_time TIMESTAMP NULL,
+        delivery_address TEXT,
+        special_instructions TEXT,
+        FOREIGN KEY (user_id) REFERENCES Users(user_id),
+        FOREIGN KEY (restaurant_id) REFERENCES Restaurants(restaurant_id)
+    )
+    """,
+
+    # Order Items Table
+    """
+    CREATE TABLE IF NOT EXISTS OrderItems (
+        order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        order_id INT,
+        menu_item_id INT,
+        quantity INT NOT NULL,
+        item_price DECIMAL(10, 2) NOT NULL,
+        FOREIGN KEY (order_id) REFERENCES Orders(order_id),
+        FOREIGN KEY (menu_item_id) REFERENCES MenuItems(menu_item_id)
+    )
+    """,
+
+    # Cart Items Table
+    """
+    CREATE TABLE IF NOT EXISTS CartItems (
+        cart_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT,
+        menu_item_id INT,
+        quantity INT DEFAULT 1,
+        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES Users(user_id),
+        FOREIGN KEY (menu_item_id) REFERENCES MenuItems(menu_item_id),
+        UNIQUE KEY unique_cart_item (user_id, menu_item_id)
+    )
+    """,
+
+    # User Preferences Table
+    """
+    CREATE TABLE IF NOT EXISTS UserPreferences (
+        user_id INT PRIMARY KEY,
+        dark_mode BOOLEAN DEFAULT FALSE,
+        notification_enabled BOOLEAN DEFAULT TRUE,
+        dietary_preferences ENUM('None', 'Vegetarian', 'Vegan', 'Gluten-Free', 'Keto') DEFAULT 'None',
+        FOREIGN KEY (user_id) REFERENCES Users(user_id)
+    )
+    """,
+]
+
+def upgrade(cursor, backend):
+    """Create all tables; IF NOT EXISTS adopts databases set up before migrations"""
+    for statement in TABLES:
+        cursor.execute(statement)
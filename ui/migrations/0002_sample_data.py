@@ -0,0 +1,184 @@
+"""Sample catalog, users and orders for a new database"""
+from migrations import insert_rows
+from password_utility import PasswordManager
+
+def insert_sample_categories(cursor):
+    """
+    Insert sample food categories
+    """
+    categories = [
+        ('FastFood', 'Quick and convenient meals'),
+        ('Indian', 'Traditional Indian cuisine'),
+        ('Chinese', 'Chinese and Asian dishes'),
+        ('Desserts', 'Sweet treats and desserts'),
+        ('Healthy', 'Nutritious and health-conscious options'),
+        ('Pizza', 'Various types of pizzas'),
+        ('Burger', 'Gourmet burger options')
+    ]
+    
+    insert_rows(
+        cursor,
+        "Categories",
+        "INSERT INTO Categories (category_name, description) VALUES (%s, %s)", 
+        categories
+    )
+
+def insert_sample_restaurants(cursor):
+    """
+    Insert sample restaurants
+    """
+    restaurants = [
+        # Name, description, category_id, rating, delivery_time, address, contact
+        ('Pizza Palace', 'Best pizzas in town', 1, 4.5, 30, '123 Main St', '555-1234'),
+        ('Burger Haven', 'Gourmet burgers', 1, 4.3, 25, '456 Elm St', '555-5678'),
+        ('Curry King', 'Authentic Indian cuisine', 2, 4.7, 40, '789 Spice Lane', '555-9012'),
+        ('Wok Express', 'Chinese fast food', 3, 4.2, 35, '321 Dragon St', '555-3456'),
+        ('Sweet Treats', 'Delicious desserts', 4, 4.6, 20, '654 Sugar Road', '555-7890'),
+        ('Green Leaf Cafe', 'Healthy organic meals', 5, 4.4, 30, '987 Health Ave', '555-2345')
+    ]
+    
+    insert_rows(
+        cursor,
+        "Restaurants",
+        """INSERT INTO Restaurants 
+        (restaurant_name, description, category_id, rating, delivery_time, address, contact_number) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s)""", 
+        restaurants
+    )
+
+def insert_sample_menu_items(cursor):
+    """
+    Insert sample menu items for restaurants
+    """
+    menu_items = [
+        # restaurant_id, name, description, price, category, is_vegetarian
+        # Pizza Palace items
+        (1, 'Margherita Pizza', 'Classic tomato and mozzarella', 12.99, 'Pizza', True),
+        (1, 'Pepperoni Pizza', 'Spicy pepperoni pizza', 14.99, 'Pizza', False),
+        (1, 'Vegetarian Supreme', 'Loaded with fresh vegetables', 13.99, 'Pizza', True),
+
+        # Burger Haven items
+        (2, 'Classic Cheeseburger', 'Beef patty with cheese', 10.99, 'Burger', False),
+        (2, 'Veggie Burger', 'Plant-based burger', 11.99, 'Burger', True),
+        (2, 'Chicken Burger', 'Grilled chicken burger', 12.99, 'Burger', False),
+
+        # Curry King items
+        (3, 'Chicken Tikka Masala', 'Creamy chicken curry', 15.99, 'Curry', False),
+        (3, 'Vegetable Biryani', 'Mixed vegetable rice', 12.99, 'Rice', True),
+        (3, 'Paneer Butter Masala', 'Cottage cheese in creamy sauce', 13.99, 'Vegetarian', True),
+
+        # Wok Express items
+        (4, 'Kung Pao Chicken', 'Spicy chicken with peanuts', 14.99, 'Main Course', False),
+        (4, 'Vegetable Fried Rice', 'Mixed vegetable rice', 10.99, 'Rice', True),
+        (4, 'Spring Rolls', 'Crispy vegetable rolls', 6.99, 'Appetizer', True),
+
+        # Sweet Treats items
+        (5, 'Chocolate Cake', 'Rich chocolate cake', 8.99, 'Dessert', True),
+        (5, 'Apple Pie', 'Classic apple pie', 7.99, 'Dessert', True),
+        (5, 'Cheesecake', 'New York style cheesecake', 9.99, 'Dessert', True),
+
+        # Green Leaf Cafe items
+        (6, 'Quinoa Salad', 'Healthy quinoa mix', 11.99, 'Salad', True),
+        (6, 'Grilled Chicken Salad', 'Protein-packed salad', 13.99, 'Salad', False),
+        (6, 'Smoothie Bowl', 'Nutritious fruit bowl', 9.99, 'Breakfast', True)
+    ]
+    
+    insert_rows(
+        cursor,
+        "MenuItems",
+        """INSERT INTO MenuItems 
+        (restaurant_id, item_name, description, price, category, is_vegetarian) 
+        VALUES (%s, %s, %s, %s, %s, %s)""", 
+        menu_items,
+        name_index=1
+    )
+
+def insert_sample_users(cursor):
+    """
+    Insert sample users with hashed passwords
+    """
+    users = [
+        # first_name, last_name, email, hashed_password, phone, address
+        ('John', 'Doe', 'john.doe@example.com', 
+         PasswordManager.hash_password('password123'), '1234567890', '123 Main St, Anytown, USA'),
+        ('Jane', 'Smith', 'jane.smith@example.com', 
+         PasswordManager.hash_password('securepass'), '9876543210', '456 Elm St, Somewhere, USA'),
+        ('Alice', 'Johnson', 'alice.j@example.com', 
+         PasswordManager.hash_password('hello123'), '5555555555', '789 Oak Rd, Elsewhere, USA')
+    ]
+    
+    insert_rows(
+        cursor,
+        "Users",
+        """INSERT INTO Users 
+        (first_name, last_name, email, password, phone_number, address) 
+        VALUES (%s, %s, %s, %s, %s, %s)""", 
+        users,
+        name_index=2
+    )
+
+def insert_sample_orders(cursor):
+    """
+    Insert sample orders with updated handling of estimated_delivery_time
+    """
+    # First, insert the orders without specifying estimated_delivery_time
+    orders = [
+        # user_id, restaurant_id, total_amount, status, delivery_address
+        (1, 1, 27.98, 'Delivered', '123 Main St, Anytown, USA'),
+        (2, 3, 29.97, 'Out for Delivery', '456 Elm St, Somewhere, USA'),
+        (3, 5, 18.98, 'Preparing', '789 Oak Rd, Elsewhere, USA')
+    ]
+    
+    # Insert orders
+    order_ids = insert_rows(
+        cursor,
+        "Orders",
+        """INSERT INTO Orders 
+        (user_id, restaurant_id, total_amount, status, delivery_address) 
+        VALUES (%s, %s, %s, %s, %s)""", 
+        orders,
+        name_index=4
+    )
+    
+    # Update the estimated delivery times
+    cursor.execute(
+        """UPDATE Orders 
+        SET estimated_delivery_time = DATE_ADD(order_date, INTERVAL 45 MINUTE)
+        WHERE estimated_delivery_time IS NULL"""
+    )
+    
+    # Insert order items for the orders we just created
+    order_items = [
+        # order_id, menu_item_id, quantity, item_price
+        (order_ids[0], 1, 2, 12.99),  # First order: 2 Margherita Pizzas
+        (order_ids[1], 7, 1, 15.99),  # Second order: 1 Chicken Tikka Masala
+        (order_ids[2], 13, 2, 8.99)   # Third order: 2 Chocolate Cakes
+    ]
+    
+    insert_rows(
+        cursor,
+        "OrderItems",
+        """INSERT INTO OrderItems 
+        (order_id, menu_item_id, quantity, item_price) 
+        VALUES (%s, %s, %s, %s)""", 
+        order_items
+    )
+
+
+def upgrade(cursor, backend):
+    """
+    Insert the sample data into an empty database
+
+    Databases that already have restaurants, including those filled by the
+    setup script before migrations existed, are left as they are
+    """
+    cursor.execute("SELECT COUNT(*) FROM Restaurants")
+    if cursor.fetchone()[0]:
+        print("Restaurants already present, skipping sample data")
+        return
+
+    insert_sample_categories(cursor)
+    insert_sample_restaurants(cursor)
+    insert_sample_menu_items(cursor)
+    insert_sample_users(cursor)
+    insert_sample_orders(cursor)
@@ -0,0 +1,23 @@
+"""Secondary indexes for the filters and sort orders of the app's hot queries"""
+from migrations import create_index
+
+# (name, table, columns). Both engines append the primary key to every
+# secondary index, which is what the keyset pagination tie-breaks on.
+INDEXES = [
+    # track.py active orders and profile.py past orders: equality on user
+    # and status, then newest first
+    ("idx_orders_user_status_date", "Orders", "user_id, status, order_date"),
+    # Order items of an order, for tracking and reordering; covers the
+    # columns both read
+    ("idx_order_items_order", "OrderItems", "order_id, menu_item_id, quantity"),
+    # menu.py: one restaurant's menu in category, name order
+    ("idx_menu_items_restaurant", "MenuItems", "restaurant_id, category, item_name"),
+    # home.py listing: best rated first, overall and within a category
+    ("idx_restaurants_rating", "Restaurants", "rating"),
+    ("idx_restaurants_category_rating", "Restaurants", "category_id, rating"),
+]
+
+def upgrade(cursor, backend):
+    """Create the indexes that are missing"""
+    for name, table, columns in INDEXES:
+        create_index(cursor, backend, name, table, columns)
@@ -0,0 +1,55 @@
+"""Full-text indexes over restaurant and dish text, used by search.py"""
+from db_backends import DatabaseError as Error
+from migrations import create_index
+
+# (name, table, columns) of the MySQL FULLTEXT indexes
+FULLTEXT_INDEXES = [
+    ("ft_restaurants_text", "Restaurants", "restaurant_name, description"),
+    ("ft_menu_items_text", "MenuItems", "item_name, description, category"),
+]
+
+# SQLite FTS5 tables indexing the same columns. They are external content
+# tables, storing only the index, and triggers keep them in step with
+# their source table.
+FTS_TABLES = [
+    # (fts table, source table, key column, indexed columns)
+    ("RestaurantSearch", "Restaurants", "restaurant_id", ["restaurant_name", "description"]),
+    ("MenuItemSearch", "MenuItems", "menu_item_id", ["item_name", "description", "category"]),
+]
+
+def create_fts_table(cursor, fts_table, table, key, columns):
+    """Create an FTS5 table over a table's text columns, its triggers, and fill it"""
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    insert_new = f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.{key}, {new_values});"
+    delete_old = (f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                  f"VALUES ('delete', old.{key}, {old_values});")
+
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='{key}')"
+    )
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN {insert_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN {delete_old} END")
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {column_list} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END"
+    )
+    cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    print(f"Created full-text table {fts_table} over {table} ({column_list})")
+
+def upgrade(cursor, backend):
+    """Create the full-text indexes for the backend in use"""
+    if backend.name == "mysql":
+        for name, table, columns in FULLTEXT_INDEXES:
+            create_index(cursor, backend, name, table, columns, kind="FULLTEXT")
+        return
+
+    for fts_table, table, key, columns in FTS_TABLES:
+        try:
+            create_fts_table(cursor, fts_table, table, key, columns)
+        except Error as e:
+            # SQLite builds without FTS5; search.py falls back to LIKE
+            print(f"Full-text search unavailable, skipping {fts_table}: {e}")
+            return
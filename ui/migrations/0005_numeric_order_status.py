@@ -0,0 +1,29 @@
+"""Store Orders.status as the OrderStatus code instead of an ENUM of labels"""
+from migrations import create_index
+from order_status import STATUS_LABELS, OrderStatus
+
+# Label of the old ENUM -> code; codes left by an interrupted run stay as they are
+TO_CODE = "CASE status {} ELSE status END".format(
+    " ".join(f"WHEN '{label}' THEN '{status:d}'" for status, label in STATUS_LABELS.items())
+)
+
+def upgrade(cursor, backend):
+    """Convert the column in place, keeping (user_id, status, order_date) indexed"""
+    if backend.name == "mysql":
+        # Via text, so each label can be replaced by its code before the
+        # column becomes numeric; the index is rebuilt with the column
+        cursor.execute("ALTER TABLE Orders MODIFY status VARCHAR(20) NOT NULL DEFAULT 'Placed'")
+        cursor.execute(f"UPDATE Orders SET status = {TO_CODE}")
+        cursor.execute(
+            f"ALTER TABLE Orders MODIFY status TINYINT UNSIGNED NOT NULL DEFAULT {OrderStatus.PLACED:d}"
+        )
+        return
+
+    # SQLite cannot change a column's type, so the codes go into a new
+    # column that takes the old one's place
+    cursor.execute(f"ALTER TABLE Orders ADD COLUMN status_code TINYINT NOT NULL DEFAULT {OrderStatus.PLACED:d}")
+    cursor.execute(f"UPDATE Orders SET status_code = {TO_CODE}")
+    cursor.execute("DROP INDEX idx_orders_user_status_date ON Orders")
+    cursor.execute("ALTER TABLE Orders DROP COLUMN status")
+    cursor.execute("ALTER TABLE Orders RENAME COLUMN status_code TO status")
+    create_index(cursor, backend, "idx_orders_user_status_date", "Orders", "user_id, status, order_date")
@@ -0,0 +1,195 @@
+"""
+Versioned schema migrations
+
+Each module in this package named NNNN_description.py is one migration.
+It defines upgrade(cursor, backend), which brings the schema from the
+previous version to NNNN. Applied versions are recorded in SchemaVersion,
+so a start-up against a current database costs a single query.
+"""
+import importlib
+import pkgutil
+import re
+from typing import List, NamedTuple, Optional
+from db_backends import DB_CONFIG, DatabaseError as Error, IntegrityError, get_backend
+from db_connection import DEFAULT_BATCH_SIZE, bulk_execute
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS SchemaVersion (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_MIGRATION_MODULE = re.compile(r"^(\d{4})_(\w+)$")
+
+class Migration(NamedTuple):
+    """One schema change, loaded from its module"""
+    version: int
+    name: str
+    module: object
+
+def discover() -> List[Migration]:
+    """
+    Load every migration module of this package
+
+    Returns:
+        list: Migrations ordered by version
+
+    Raises:
+        ValueError: If two modules claim the same version
+    """
+    migrations = {}
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MIGRATION_MODULE.match(module_info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version:04d}: {module_info.name}")
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations[version] = Migration(version, match.group(2), module)
+    return [migrations[version] for version in sorted(migrations)]
+
+def latest_version() -> int:
+    """Version the schema has once every migration is applied"""
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+def current_version(cursor) -> int:
+    """
+    Read the applied schema version
+
+    Returns:
+        int: Highest applied version, 0 for a database without SchemaVersion
+    """
+    try:
+        cursor.execute("SELECT MAX(version) FROM SchemaVersion")
+        row = cursor.fetchone()
+    except Error:
+        # Fresh database, or one set up before migrations existed
+        return 0
+    return row[0] or 0
+
+def _connect(backend):
+    """
+    Connect to the application database, creating it if it does not exist
+
+    Only a missing MySQL database takes the slow path; SQLite creates its
+    file on connect.
+    """
+    try:
+        return backend.connect(database=True)
+    except Error:
+        connection = backend.connect(database=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']}")
+        cursor.execute(f"USE {DB_CONFIG['database']}")
+    finally:
+        cursor.close()
+    return connection
+
+def migrate(target: Optional[int] = None) -> int:
+    """
+    Apply pending migrations in version order
+
+    Each migration and its SchemaVersion row commit together. On SQLite the
+    whole migration is rolled back on failure; MySQL commits DDL statements
+    implicitly, so migrations are written to be safe to re-run. Two
+    processes migrating at once collide on the SchemaVersion primary key
+    instead of both recording a version.
+
+    Args:
+        target (int, optional): Stop at this version instead of the latest
+
+    Returns:
+        int: Schema version after migrating
+    """
+    backend = get_backend()
+    migrations = discover()
+    connection = _connect(backend)
+    cursor = connection.cursor()
+    try:
+        version = current_version(cursor)
+        pending = [
+            migration for migration in migrations
+            if migration.version > version and (target is None or migration.version <= target)
+        ]
+        if not pending:
+            return version
+
+        cursor.execute(SCHEMA_VERSION_TABLE)
+        for migration in pending:
+            print(f"Applying migration {migration.version:04d} {migration.name}")
+            connection.start_transaction()
+            try:
+                migration.module.upgrade(cursor, backend)
+                cursor.execute(
+                    "INSERT INTO SchemaVersion (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name)
+                )
+                connection.commit()
+            except Error as e:
+                print(f"Migration {migration.version:04d} failed: {e}")
+                connection.rollback()
+                raise
+            version = migration.version
+        return version
+    finally:
+        cursor.close()
+        connection.close()
+
+def create_index(cursor, backend, name, table, columns, kind=""):
+    """
+    Create an index unless it exists already
+
+    MySQL has no CREATE INDEX IF NOT EXISTS, so the check keeps migrations
+    that add indexes safe to re-run
+
+    Args:
+        name (str): Index name, unique within the database
+        table (str): Table to index
+        columns (str): Comma-separated column list, most selective use first
+        kind (str, optional): 'UNIQUE' or, on MySQL, 'FULLTEXT'
+    """
+    if backend.index_exists(cursor, table, name):
+        print(f"Index {name} already exists")
+        return
+    cursor.execute(f"CREATE {kind + ' ' if kind else ''}INDEX {name} ON {table} ({columns})")
+    print(f"Created {kind.lower() + ' ' if kind else ''}index {name} on {table} ({columns})")
+
+def insert_rows(cursor, table, query, rows, name_index=0):
+    """
+    Insert rows with multi-row statements
+
+    A batch that hits an existing row is rolled back by the server as a
+    whole, so that batch alone is retried one row at a time to keep its
+    new rows; the batches before it are already written
+
+    Returns:
+        list: Ids of the rows inserted, in order
+    """
+    inserted_ids = []
+    added = 0
+    for start in range(0, len(rows), DEFAULT_BATCH_SIZE):
+        batch = rows[start:start + DEFAULT_BATCH_SIZE]
+        try:
+            result = bulk_execute(cursor, query, batch)
+        except IntegrityError:
+            for row in batch:
+                try:
+                    cursor.execute(query, row)
+                    inserted_ids.append(cursor.lastrowid)
+                    print(f"Added to {table}: {row[name_index]}")
+                except IntegrityError as e:
+                    print(f"Skipped {row[name_index]} in {table}: {e}")
+            continue
+
+        added += result.rowcount
+        # Migrations run alone, so the batch got consecutive ids
+        if result.first_ids:
+            inserted_ids.extend(range(result.first_ids[0], result.first_ids[0] + len(batch)))
+    if added:
+        print(f"Added {added} rows to {table}")
+    return inserted_ids
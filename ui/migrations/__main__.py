@@ -0,0 +1,11 @@
+"""Apply pending migrations without starting the app: python -m migrations [target_version]"""
+import sys
+from migrations import latest_version, migrate
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    version = migrate(target)
+    print(f"Schema version {version} (latest {latest_version()})")
+
+if __name__ == "__main__":
+    main()
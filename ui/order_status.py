@@ -0,0 +1,44 @@
+from enum import IntEnum
+
+class OrderStatus(IntEnum):
+    """Lifecycle of an order, stored as a small integer in Orders.status"""
+
+    PLACED = 0
+    PREPARING = 1
+    OUT_FOR_DELIVERY = 2
+    DELIVERED = 3
+
+    @property
+    def label(self) -> str:
+        """Name shown to users"""
+        return STATUS_LABELS[self]
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the order is still on its way"""
+        return self < OrderStatus.DELIVERED
+
+    @classmethod
+    def from_label(cls, label: str) -> "OrderStatus":
+        """
+        Look up a status by its label, e.g. a value of the old ENUM column
+
+        Raises:
+            ValueError: If no status has this label
+        """
+        for status, status_label in STATUS_LABELS.items():
+            if status_label == label:
+                return status
+        raise ValueError(f"Unknown order status '{label}'")
+
+STATUS_LABELS = {
+    OrderStatus.PLACED: "Placed",
+    OrderStatus.PREPARING: "Preparing",
+    OrderStatus.OUT_FOR_DELIVERY: "Out for Delivery",
+    OrderStatus.DELIVERED: "Delivered",
+}
+
+# SQL conditions on Orders aliased as o. Both compare the column with a
+# constant, so (user_id, status, order_date) serves them as index ranges
+ACTIVE_ORDERS_CONDITION = f"o.status < {OrderStatus.DELIVERED:d}"
+DELIVERED_ORDERS_CONDITION = f"o.status = {OrderStatus.DELIVERED:d}"
@@ -0,0 +1,207 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional, Sequence, Tuple
+from db_connection import DatabaseConnection
+from row_factories import ROW_DICT, ROW_RECORD
+
+DEFAULT_PAGE_SIZE = 20
+
+class Page(NamedTuple):
+    """One page of a keyset-paginated result"""
+    rows: list
+    next_cursor: Optional[str]  # Token for the following page, None on the last page
+
+def _plain(value):
+    """Make a sort key value JSON-friendly without losing how it compares"""
+    if isinstance(value, datetime):
+        # Space separator matches what MySQL and SQLite store and compare
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def encode_cursor(values: Sequence) -> str:
+    """Turn the sort key of the last row into an opaque, URL-safe token"""
+    raw = json.dumps([_plain(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> list:
+    """
+    Read the sort key back from a token
+
+    Raises:
+        ValueError: If the token was not produced by encode_cursor
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid page cursor: {e}") from None
+    if not isinstance(values, list):
+        raise ValueError("Invalid page cursor")
+    return values
+
+class Keyset:
+    """Sort order used to seek to the next page instead of skipping rows with OFFSET"""
+
+    def __init__(self, *columns: Tuple[str, str], descending: bool = True):
+        """
+        Initialize the keyset
+
+        Args:
+            *columns: (sql_expression, result_column) pairs, most significant
+                first; the last one must be unique (usually the primary key)
+                and none may be NULL
+            descending (bool): Newest/highest first
+        """
+        if not columns:
+            raise ValueError("A keyset needs at least one column")
+        self.columns = columns
+        self.descending = descending
+
+    def _seek_condition(self) -> str:
+        """
+        Rows strictly after the cursor, e.g. for (a, b) descending:
+        a < %s OR (a = %s AND b < %s)
+
+        Spelled out instead of a row comparison so MySQL uses the index
+        """
+        operator = "<" if self.descending else ">"
+        alternatives = []
+        for index, (expression, _) in enumerate(self.columns):
+            equal = [f"{earlier} = %s" for earlier, _ in self.columns[:index]]
+            alternatives.append("(" + " AND ".join(equal + [f"{expression} {operator} %s"]) + ")")
+        return "(" + " OR ".join(alternatives) + ")"
+
+    def _seek_params(self, values: Sequence) -> tuple:
+        """Parameters matching _seek_condition"""
+        params = []
+        for index in range(len(self.columns)):
+            params.extend(values[:index + 1])
+        return tuple(params)
+
+    def query(self, select: str, where: Optional[str] = None, params: Sequence = (),
+              cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        Build the SQL for one page
+
+        Args:
+            select (str): SELECT ... FROM ... JOIN ... without WHERE/ORDER BY/LIMIT
+            where (str, optional): Filter condition using %s placeholders
+            params (sequence): Parameters for where
+            cursor (str, optional): next_cursor of the previous page
+            page_size (int): Rows per page
+
+        Returns:
+            tuple: (sql, params); one extra row is requested to detect the last page
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        conditions = []
+        params = list(params or ())
+        if where:
+            conditions.append(f"({where})")
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(self.columns):
+                raise ValueError("Page cursor does not match this sort order")
+            conditions.append(self._seek_condition())
+            params.extend(self._seek_params(values))
+
+        direction = "DESC" if self.descending else "ASC"
+        sql = select.strip()
+        if conditions:
+            sql += "\nWHERE " + " AND ".join(conditions)
+        sql += "\nORDER BY " + ", ".join(f"{expression} {direction}" for expression, _ in self.columns)
+        sql += f"\nLIMIT {int(page_size) + 1}"
+        return sql, tuple(params)
+
+    def page(self, rows: list, page_size: int = DEFAULT_PAGE_SIZE) -> Page:
+        """
+        Turn the rows fetched for query() into a Page
+
+        Args:
+            rows (list): Dict or record rows, up to page_size + 1 of them
+            page_size (int): Rows per page passed to query()
+
+        Returns:
+            Page: At most page_size rows and the cursor for the next page
+        """
+        if len(rows) <= page_size:
+            return Page(rows, None)
+        rows = rows[:page_size]
+        last = rows[-1]
+        return Page(rows, encode_cursor([last[name] for _, name in self.columns]))
+
+# Restaurant listings: best rated first, id breaks ties
+RESTAURANTS_BY_RATING = Keyset(("r.rating", "rating"), ("r.restaurant_id", "restaurant_id"))
+
+# Order history: newest first, id breaks ties
+ORDERS_BY_DATE = Keyset(("o.order_date", "order_date"), ("o.order_id", "order_id"))
+
+def fetch_page(select: str, keyset: Keyset, where: Optional[str] = None, params: Sequence = (),
+               cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE,
+               row_factory: str = ROW_DICT, **options) -> Page:
+    """
+    Fetch one page of a query in keyset order
+
+    Each page is an index seek from the previous page's last row, so page
+    100 costs the same as page 1, unlike OFFSET which reads and discards
+    every earlier row.
+
+    Example:
+        page = fetch_page("SELECT r.* FROM Restaurants r", RESTAURANTS_BY_RATING)
+        more = fetch_page("SELECT r.* FROM Restaurants r", RESTAURANTS_BY_RATING,
+                          cursor=page.next_cursor)
+
+    Args:
+        select (str): SELECT ... FROM ... JOIN ... without WHERE/ORDER BY/LIMIT;
+            must return the keyset's result columns
+        keyset (Keyset): Sort order, e.g. RESTAURANTS_BY_RATING
+        where (str, optional): Filter condition using %s placeholders
+        params (sequence): Parameters for where
+        cursor (str, optional): next_cursor of the previous page
+        page_size (int, optional): Rows per page
+        row_factory (str, optional): 'dict' or 'record'
+        **options: Extra execute_query arguments such as cache_ttl
+
+    Returns:
+        Page: Rows and the cursor for the next page
+    """
+    if row_factory not in (ROW_DICT, ROW_RECORD):
+        raise ValueError("fetch_page needs named rows, use row_factory 'dict' or 'record'")
+
+    sql, sql_params = keyset.query(select, where, params, cursor, page_size)
+    rows = DatabaseConnection.execute_query(sql, sql_params, fetch=True, row_factory=row_factory, **options)
+    return keyset.page(rows, page_size)
+
+def watch_scroll_end(scrollable, callback, threshold: float = 0.9):
+    """
+    Call callback whenever a CTkScrollableFrame is scrolled near its end
+
+    Used to load the next page before the user reaches the bottom. The
+    callback may fire repeatedly and should ignore calls while a page is
+    already loading or when there are no more pages.
+
+    Args:
+        scrollable: CTkScrollableFrame, vertical or horizontal
+        callback (callable): Called without arguments
+        threshold (float): Visible fraction of the content at which to fire
+    """
+    canvas = scrollable._parent_canvas
+    scrollbar_set = scrollable._scrollbar.set
+    option = "xscrollcommand" if scrollable.cget("orientation") == "horizontal" else "yscrollcommand"
+
+    def on_scroll(first, last):
+        scrollbar_set(first, last)
+        # Content shorter than the view reports (0, 1); nothing to scroll to
+        if float(first) > 0.0 and float(last) >= threshold:
+            callback()
+
+    canvas.configure(**{option: on_scroll})
@@ -5,8 +5,23 @@ import re
 import os
 from PIL import Image
 from db_connection import DatabaseConnection
+from cart_repository import CartRepository
 from password_utility import PasswordManager
 from image_handler import ImageHandler
+from pagination import ORDERS_BY_DATE, fetch_page, watch_scroll_end
+from order_status import DELIVERED_ORDERS_CONDITION
+
+# Past order cards fetched per page
+PAST_ORDERS_PAGE_SIZE = 3
+
+# Delivered orders of a user; pagination adds the seek condition, ORDER BY
+# and LIMIT
+PAST_ORDERS = """
+SELECT o.order_id, r.restaurant_id, r.restaurant_name, o.order_date, o.total_amount
+FROM Orders o
+JOIN Restaurants r ON o.restaurant_id = r.restaurant_id
+"""
+PAST_ORDERS_WHERE = f"o.user_id = %s AND {DELIVERED_ORDERS_CONDITION}"
 
 class UserProfileApp:
     def __init__(self, user_id=None):
@@ -28,7 +43,7 @@ class UserProfileApp:
 
         # Fetch user data
         self.user_data = self.fetch_user_data()
-        self.past_orders = self.fetch_past_orders()
+        self.past_orders, self.past_orders_cursor = self.fetch_past_orders()
 
         # Setup UI
         self.setup_ui()
@@ -57,32 +72,42 @@ class UserProfileApp:
             print(f"Error fetching user details: {e}")
             return None
 
-    def fetch_past_orders(self):
+    def fetch_past_orders(self, cursor=None):
         """
-        Fetch past orders for the user
+        Fetch a page of past orders for the user, newest first
+
+        Args:
+            cursor (str, optional): Cursor returned with the previous page
+
+        Returns:
+            tuple: (orders, cursor of the next page or None)
         """
         if not self.user_id:
-            return []
+            return [], None
         
         try:
-            query = """
-            SELECT o.order_id, r.restaurant_id, r.restaurant_name, o.order_date, o.total_amount
-            FROM Orders o
-            JOIN Restaurants r ON o.restaurant_id = r.restaurant_id
-            WHERE o.user_id = %s AND o.status = 'Delivered'
-            ORDER BY o.order_date DESC
-            LIMIT 5
-            """
-            results = DatabaseConnection.execute_query(
-                query, 
-                params=(self.user_id,), 
-                fetch=True
+            page = fetch_page(
+                PAST_ORDERS,
+                ORDERS_BY_DATE,
+                where=PAST_ORDERS_WHERE,
+                params=(self.user_id,),
+                cursor=cursor,
+                page_size=PAST_ORDERS_PAGE_SIZE
             )
             
-            return results
+            return page.rows, page.next_cursor
         except Exception as e:
             print(f"Error fetching past orders: {e}")
-            return []
+            return [], None
+
+    def show_more_orders(self):
+        """Append the next page of past orders"""
+        if not self.past_orders_cursor:
+            return
+        cursor, self.past_orders_cursor = self.past_orders_cursor, None
+        orders, self.past_orders_cursor = self.fetch_past_orders(cursor)
+        self.past_orders.extend(orders)
+        self.add_order_cards(orders)
 
     def setup_ui(self):
         """
@@ -171,12 +196,10 @@ class UserProfileApp:
 
     def create_past_orders(self):
         """Create past orders section with cards and images"""
-        # Container for order cards
-        orders_container = ctk.CTkFrame(self.main_frame, fg_color="transparent")
-        orders_container.pack(fill="x", padx=50, pady=5)
-
         # Show message if no past orders
         if not self.past_orders:
+            orders_container = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+            orders_container.pack(fill="x", padx=50, pady=5)
             no_orders_label = ctk.CTkLabel(
                 orders_container, 
                 text="No past orders found", 
@@ -186,11 +209,31 @@ class UserProfileApp:
             no_orders_label.pack(pady=20)
             return
 
+        # Horizontally scrolling row of order cards; scrolling to its end
+        # loads the next page
+        self.orders_container = ctk.CTkScrollableFrame(
+            self.main_frame,
+            fg_color="transparent",
+            orientation="horizontal",
+            height=170
+        )
+        self.orders_container.pack(fill="x", padx=50, pady=5)
+        self.show_more_button = None
+        watch_scroll_end(self.orders_container, self.show_more_orders)
+
+        self.add_order_cards(self.past_orders)
+
+    def add_order_cards(self, orders):
+        """Add order cards after the ones already shown"""
+        if self.show_more_button is not None:
+            self.show_more_button.destroy()
+            self.show_more_button = None
+
         # Create cards for each past order
-        for order in self.past_orders:
+        for order in orders:
             # Order card
             order_card = ctk.CTkFrame(
-                orders_container, 
+                self.orders_container, 
                 fg_color="white", 
                 width=280, 
                 height=150, 
@@ -273,26 +316,28 @@ class UserProfileApp:
             )
             reorder_btn.place(x=20, y=110)
 
+        # More pages remain
+        if self.past_orders_cursor:
+            self.show_more_button = ctk.CTkButton(
+                self.orders_container,
+                text="Show more",
+                font=("Arial", 14),
+                fg_color="#6B7280",
+                text_color="white",
+                hover_color="#4B5563",
+                width=120,
+                height=35,
+                command=self.show_more_orders
+            )
+            self.show_more_button.pack(side="left", padx=10, pady=5)
+
     def reorder(self, order):
         """
         Reorder functionality
         """
         try:
-            # Fetch order items
-            query = """
-            SELECT menu_item_id, quantity 
-            FROM OrderItems 
-            WHERE order_id = %s
-            """
-            order_items = DatabaseConnection.execute_query(
-                query, 
-                params=(order.get('order_id'),), 
-                fetch=True
-            )
-
-            # Add items to cart
-            for item in order_items:
-                self.add_to_cart(item['menu_item_id'], item['quantity'])
+            # Copy the order's items into the cart with a single upsert
+            CartRepository.add_order_items(self.user_id, order.get('order_id'))
 
             # Show confirmation message
             confirmation = ctk.CTkToplevel(self.root)
@@ -345,47 +390,6 @@ class UserProfileApp:
         confirmation_window.destroy()
         self.go_to_cart()
 
-    def add_to_cart(self, menu_item_id, quantity):
-        """
-        Add item to cart
-        """
-        try:
-            # Check if item already in cart
-            check_query = """
-            SELECT cart_item_id 
-            FROM CartItems 
-            WHERE user_id = %s AND menu_item_id = %s
-            """
-            existing_cart_item = DatabaseConnection.execute_query(
-                check_query, 
-                params=(self.user_id, menu_item_id), 
-                fetch=True
-            )
-
-            if existing_cart_item:
-                # Update quantity if item exists
-                update_query = """
-                UPDATE CartItems 
-                SET quantity = quantity + %s 
-                WHERE user_id = %s AND menu_item_id = %s
-                """
-                DatabaseConnection.execute_query(
-                    update_query, 
-                    params=(quantity, self.user_id, menu_item_id)
-                )
-            else:
-                # Insert new cart item
-                insert_query = """
-                INSERT INTO CartItems (user_id, menu_item_id, quantity) 
-                VALUES (%s, %s, %s)
-                """
-                DatabaseConnection.execute_query(
-                    insert_query, 
-                    params=(self.user_id, menu_item_id, quantity)
-                )
-        except Exception as e:
-            print(f"Error adding to cart: {e}")
-
     def create_profile_info(self):
         """Create profile information section"""
         # Profile info container
@@ -0,0 +1,196 @@
+import copy
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+_TABLE_PATTERN = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?",
+    re.IGNORECASE
+)
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "ALTER", "DROP", "TRUNCATE", "CREATE")
+
+_MISS = object()
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace so formatting differences map to the same cache key"""
+    return _WHITESPACE.sub(" ", query).strip().rstrip(";")
+
+def tables_in(query: str) -> frozenset:
+    """
+    Find the tables a statement reads from or writes to
+
+    Args:
+        query (str): SQL statement
+
+    Returns:
+        frozenset: Lower-cased table names
+    """
+    return frozenset(name.lower() for name in _TABLE_PATTERN.findall(query))
+
+def is_write(query: str) -> bool:
+    """Check whether a statement modifies data or schema"""
+    return query.lstrip().upper().startswith(_WRITE_PREFIXES)
+
+def _estimate_size(value) -> int:
+    """Rough in-memory size of a cached result, in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for column, values in value.items():
+            size += sys.getsizeof(column) + _estimate_size(values)
+        return size
+    if isinstance(value, (list, tuple)):
+        for row in value:
+            size += sys.getsizeof(row)
+            fields = row.values() if hasattr(row, "values") else row
+            # Column lists of the 'columns' layout hold plain values
+            if isinstance(fields, (str, bytes)) or not hasattr(fields, "__iter__"):
+                continue
+            for field in fields:
+                size += sys.getsizeof(field)
+    return size
+
+def _copy_result(value):
+    """
+    Copy a result down to its rows, so callers that sort the list or change
+    a row never change the cached copy
+
+    Field values are immutable (numbers, strings, dates), so rows are copied
+    shallowly; tuple rows are shared as they are.
+    """
+    if isinstance(value, dict):
+        return {column: list(values) for column, values in value.items()}
+    if isinstance(value, list):
+        return [row if isinstance(row, tuple) else copy.copy(row) for row in value]
+    return copy.copy(value)
+
+class QueryCache:
+    """In-process cache of query results with TTLs, LRU eviction and table invalidation"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, max_entries: int = 1000):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes (int): Approximate memory budget for cached results
+            max_entries (int): Upper bound on the number of cached queries
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (result, expires_at, tables, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query: str, params, row_factory: str):
+        """Build the cache key for a query"""
+        return (normalize_sql(query), tuple(params) if params else (), row_factory)
+
+    def get(self, key, default=None):
+        """
+        Look up a cached result
+
+        Returns:
+            A copy of the cached result, or default if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISS)
+            if entry is _MISS:
+                self.misses += 1
+                return default
+
+            result, expires_at, _, size = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(result)
+
+    def put(self, key, result, ttl: float, tables=None):
+        """
+        Store a result
+
+        Args:
+            key: Key from make_key
+            result: Query result to cache
+            ttl (float): Seconds the result stays valid
+            tables (iterable, optional): Tables whose writes invalidate it
+        """
+        size = _estimate_size(result)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[3]
+
+            self._entries[key] = (_copy_result(result), time.monotonic() + ttl,
+                                  frozenset(tables or tables_in(key[0])), size)
+            self._bytes += size
+
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self.evictions += 1
+
+    def invalidate_tables(self, tables) -> int:
+        """
+        Drop every cached result that reads one of the given tables
+
+        Returns:
+            int: Number of entries removed
+        """
+        tables = {table.lower() for table in tables}
+        if not tables:
+            return 0
+
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] & tables]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[3]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_for(self, query: str) -> int:
+        """Invalidate whatever a write statement may have changed"""
+        if not is_write(query):
+            return 0
+        return self.invalidate_tables(tables_in(query))
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Snapshot of cache usage
+
+        Returns:
+            dict: Entry count, bytes used and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
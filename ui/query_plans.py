@@ -0,0 +1,85 @@
+"""
+Check that the app's hot queries are served by indexes
+
+Runs EXPLAIN for each query the pages issue on every visit and reports the
+tables read with a full scan. Run it against a database of realistic size
+(see migrations for the indexes):
+
+    python query_plans.py
+"""
+import sys
+from typing import Dict, List
+from cart_repository import CartRepository
+from db_backends import get_backend
+from home import CATEGORY_FILTER, RESTAURANT_LISTING, RESTAURANT_PAGE_SIZE
+from menu import MENU_ITEMS, RESTAURANT_INFO
+from pagination import ORDERS_BY_DATE, RESTAURANTS_BY_RATING, encode_cursor
+from profile import PAST_ORDERS, PAST_ORDERS_PAGE_SIZE, PAST_ORDERS_WHERE
+from track import ACTIVE_ORDERS
+
+def hot_queries() -> List[tuple]:
+    """
+    The queries to check, with representative parameters
+
+    Paginated queries are checked for the first page and for a later page,
+    whose seek condition changes the plan.
+
+    Returns:
+        list: (name, sql, params) tuples
+    """
+    rating_cursor = encode_cursor([4.5, 1])
+    date_cursor = encode_cursor(["2030-01-01 00:00:00", 1])
+    return [
+        ("home listing",
+         *RESTAURANTS_BY_RATING.query(RESTAURANT_LISTING, page_size=RESTAURANT_PAGE_SIZE)),
+        ("home listing, next page",
+         *RESTAURANTS_BY_RATING.query(RESTAURANT_LISTING, cursor=rating_cursor,
+                                      page_size=RESTAURANT_PAGE_SIZE)),
+        ("home category filter",
+         *RESTAURANTS_BY_RATING.query(RESTAURANT_LISTING, CATEGORY_FILTER, (1,),
+                                      page_size=RESTAURANT_PAGE_SIZE)),
+        ("home category filter, next page",
+         *RESTAURANTS_BY_RATING.query(RESTAURANT_LISTING, CATEGORY_FILTER, (1,), rating_cursor,
+                                      RESTAURANT_PAGE_SIZE)),
+        ("menu restaurant info", RESTAURANT_INFO, (1,)),
+        ("menu items", MENU_ITEMS, (1,)),
+        ("track active orders", ACTIVE_ORDERS, (1,)),
+        ("profile past orders",
+         *ORDERS_BY_DATE.query(PAST_ORDERS, PAST_ORDERS_WHERE, (1,), page_size=PAST_ORDERS_PAGE_SIZE)),
+        ("profile past orders, next page",
+         *ORDERS_BY_DATE.query(PAST_ORDERS, PAST_ORDERS_WHERE, (1,), date_cursor, PAST_ORDERS_PAGE_SIZE)),
+        ("cart items", CartRepository.ITEMS, (1,)),
+    ]
+
+def check_plans() -> Dict[str, List[str]]:
+    """
+    EXPLAIN every hot query
+
+    Returns:
+        dict: Query name -> tables it reads with a full scan, for the
+            queries that do
+    """
+    backend = get_backend()
+    connection = backend.connect()
+    cursor = connection.cursor()
+    problems = {}
+    try:
+        for name, sql, params in hot_queries():
+            scans = backend.full_scans(cursor, sql, params)
+            if scans:
+                problems[name] = scans
+    finally:
+        cursor.close()
+        connection.close()
+    return problems
+
+def main():
+    problems = check_plans()
+    for name, scans in problems.items():
+        print(f"FULL SCAN  {name}: {', '.join(scans)}")
+    if problems:
+        sys.exit(1)
+    print(f"All {len(hot_queries())} hot queries use indexes")
+
+if __name__ == "__main__":
+    main()
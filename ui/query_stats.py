@@ -0,0 +1,253 @@
+import json
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, math.inf)
+
+# Statements slower than this (seconds) are written to the slow query log
+SLOW_QUERY_THRESHOLD = 0.2
+SLOW_QUERY_LOG = os.path.join("logs", "slow_queries.log")
+
+# Frames from these files are skipped when looking for the caller of a query;
+# the query wrappers among them are reported as the page that called them
+_INTERNAL_FILES = {"db_connection.py", "query_stats.py", "async_query.py", "contextlib.py",
+                   "thread.py", "threading.py", "_base.py",
+                   "cart_repository.py", "pagination.py", "search.py"}
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROW_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Call site attributed to queries run on behalf of another thread
+_attribution = threading.local()
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    """
+    Reduce a statement to its shape so calls differing only in values group together
+
+    Example:
+        "SELECT * FROM Users WHERE user_id = 3" -> "SELECT * FROM Users WHERE user_id = ?"
+    """
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _LISTS.sub("(...)", text)
+    text = _ROW_LISTS.sub("(...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+@contextmanager
+def attributed_to(site: str):
+    """
+    Report queries run inside the block as coming from site
+
+    Used by worker threads so background queries keep the UI call site
+    that submitted them.
+    """
+    previous = getattr(_attribution, "site", None)
+    _attribution.site = site
+    try:
+        yield
+    finally:
+        _attribution.site = previous
+
+def call_site() -> str:
+    """Describe the first frame outside the data layer, e.g. 'home.py:215 setup_header'"""
+    site = getattr(_attribution, "site", None)
+    if site:
+        return site
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES:
+            return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+class _StatementStats:
+    """Aggregated measurements for one statement fingerprint"""
+
+    __slots__ = ("calls", "errors", "total_time", "min_time", "max_time", "rows",
+                 "acquire_time", "histogram", "call_sites")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.min_time = math.inf
+        self.max_time = 0.0
+        self.rows = 0
+        self.acquire_time = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+        self.call_sites = Counter()
+
+class QueryStats:
+    """Collects per-statement latency statistics and writes a slow query log"""
+
+    def __init__(self, slow_threshold: float = SLOW_QUERY_THRESHOLD, log_path: str = SLOW_QUERY_LOG,
+                 max_log_bytes: int = 1024 * 1024, log_backups: int = 3):
+        """
+        Initialize the collector
+
+        Args:
+            slow_threshold (float): Seconds above which a statement is logged as slow
+            log_path (str): Slow query log file, rotated when it grows too big
+            max_log_bytes (int): Size at which the log rotates
+            log_backups (int): Rotated log files to keep
+        """
+        self.enabled = True
+        self.slow_threshold = slow_threshold
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.log_backups = log_backups
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def _slow_log(self) -> logging.Logger:
+        """Create the rotating slow query logger on first use"""
+        if self._logger is None:
+            directory = os.path.dirname(self.log_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            logger = logging.getLogger(f"food_delivery.slow_queries.{id(self)}")
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            handler = RotatingFileHandler(self.log_path, maxBytes=self.max_log_bytes,
+                                          backupCount=self.log_backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def record(self, query: str, elapsed: float, rows: int = 0, acquire_time: float = 0.0,
+               site: str = None, error: bool = False):
+        """
+        Record one statement execution
+
+        Args:
+            query (str): SQL as sent, values are stripped by fingerprint()
+            elapsed (float): Seconds spent executing and fetching
+            rows (int): Rows returned or affected
+            acquire_time (float): Seconds spent waiting for a pooled connection
+            site (str, optional): Caller description, looked up when omitted
+            error (bool): Whether the statement failed
+        """
+        if not self.enabled:
+            return
+
+        key = fingerprint(query)
+        site = site or call_site()
+        bucket = next(index for index, bound in enumerate(LATENCY_BUCKETS) if elapsed <= bound)
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = _StatementStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.total_time += elapsed
+            stats.min_time = min(stats.min_time, elapsed)
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.rows += max(rows or 0, 0)
+            stats.acquire_time += acquire_time
+            stats.histogram[bucket] += 1
+            stats.call_sites[site] += 1
+
+        if elapsed >= self.slow_threshold:
+            try:
+                self._slow_log().warning(
+                    "%.1fms rows=%s acquire=%.1fms site=%s sql=%s",
+                    elapsed * 1000, rows, acquire_time * 1000, site, key
+                )
+            except OSError as e:
+                print(f"Could not write slow query log: {e}")
+
+    def snapshot(self) -> list:
+        """
+        Aggregated statistics, most expensive statements first
+
+        Returns:
+            list: One dict per statement fingerprint
+        """
+        with self._lock:
+            items = list(self._statements.items())
+            result = []
+            for key, stats in items:
+                result.append({
+                    "fingerprint": key,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "total_ms": stats.total_time * 1000,
+                    "avg_ms": stats.total_time * 1000 / stats.calls,
+                    "min_ms": stats.min_time * 1000,
+                    "max_ms": stats.max_time * 1000,
+                    "rows": stats.rows,
+                    "avg_acquire_ms": stats.acquire_time * 1000 / stats.calls,
+                    "histogram": {
+                        ("inf" if math.isinf(bound) else f"{bound * 1000:g}ms"): count
+                        for bound, count in zip(LATENCY_BUCKETS, stats.histogram)
+                        if count
+                    },
+                    "call_sites": dict(stats.call_sites.most_common(5)),
+                })
+        result.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return result
+
+    def report(self, limit: int = 20) -> str:
+        """
+        Human-readable summary of the most expensive statements
+
+        Args:
+            limit (int): Statements to include
+
+        Returns:
+            str: Plain text table
+        """
+        lines = [f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'max ms':>8} {'rows':>8}  statement"]
+        for entry in self.snapshot()[:limit]:
+            lines.append(
+                f"{entry['calls']:>7} {entry['total_ms']:>10.1f} {entry['avg_ms']:>8.2f} "
+                f"{entry['max_ms']:>8.2f} {entry['rows']:>8}  {entry['fingerprint'][:120]}"
+            )
+            for site, count in entry["call_sites"].items():
+                lines.append(f"{'':>47}  <- {site} ({count}x)")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """
+        Append the current snapshot as one JSON line, tagged with the process
+
+        Args:
+            path (str): File to append to
+        """
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "process": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python",
+            "pid": os.getpid(),
+            "statements": self.snapshot(),
+        }
+        with open(path, "a", encoding="utf-8") as stats_file:
+            stats_file.write(json.dumps(record) + "\n")
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._statements.clear()
@@ -0,0 +1,178 @@
+import itertools
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from connection_pool import ConnectionPool
+
+# Wall-clock time of the session's last write. Page processes are started
+# with subprocess and inherit the environment, so a page opened right after
+# a write in another page still reads from the primary.
+LAST_WRITE_ENV = "FOOD_DB_LAST_WRITE"
+
+ROUTE_LEAST_LOADED = "least_loaded"
+ROUTE_ROUND_ROBIN = "round_robin"
+
+class Replica:
+    """One read replica with its own pool and health state"""
+
+    __slots__ = ("name", "pool", "lag", "checked_at", "down_until", "reads", "failures", "_checking")
+
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+        self.lag = None  # Seconds behind the primary, None until checked or if broken
+        self.checked_at = -float("inf")
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self._checking = False
+
+class ReplicaRouter:
+    """Chooses a read replica for each read, falling back to the primary"""
+
+    def __init__(self, replicas: List[Replica], lag_probe: Callable, max_lag: float = 5.0,
+                 lag_check_interval: float = 5.0, retry_after: float = 30.0,
+                 pin_window: float = 10.0, strategy: str = ROUTE_LEAST_LOADED):
+        """
+        Initialize the router
+
+        Args:
+            replicas (list): Replica objects to route reads to
+            lag_probe (callable): Takes a connection, returns its replication lag
+                in seconds or None if replication is broken
+            max_lag (float): Replicas further behind than this get no reads
+            lag_check_interval (float): Seconds between lag checks per replica
+            retry_after (float): Seconds a failed replica is skipped
+            pin_window (float): Seconds after a write during which reads stay
+                on the primary so the session sees its own writes
+            strategy (str): 'least_loaded' or 'round_robin'
+        """
+        if strategy not in (ROUTE_LEAST_LOADED, ROUTE_ROUND_ROBIN):
+            raise ValueError(f"Unknown routing strategy '{strategy}'")
+
+        self.replicas = replicas
+        self.lag_probe = lag_probe
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.retry_after = retry_after
+        self.pin_window = pin_window
+        self.strategy = strategy
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+        try:
+            self._last_write = float(os.environ.get(LAST_WRITE_ENV, "0"))
+        except ValueError:
+            self._last_write = 0.0
+
+    def note_write(self):
+        """Pin this session's reads to the primary for pin_window seconds"""
+        self._last_write = time.time()
+        os.environ[LAST_WRITE_ENV] = repr(self._last_write)
+
+    @property
+    def pinned(self) -> bool:
+        """Whether a recent write requires reading from the primary"""
+        return time.time() - self._last_write < self.pin_window
+
+    def _refresh_lag(self, replica: Replica):
+        """Measure a replica's lag; only one thread checks a replica at a time"""
+        with self._lock:
+            if replica._checking:
+                return
+            replica._checking = True
+
+        try:
+            connection = replica.pool.acquire(timeout=1.0)
+        except Exception as e:
+            self.mark_failed(replica, e)
+            with self._lock:
+                replica._checking = False
+            return
+
+        broken = False
+        try:
+            replica.lag = self.lag_probe(connection)
+        except Exception as e:
+            broken = True
+            self.mark_failed(replica, e)
+        finally:
+            replica.pool.release(connection, discard=broken)
+            replica.checked_at = time.monotonic()
+            with self._lock:
+                replica._checking = False
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Pick the replica for the next read
+
+        Returns:
+            Replica or None: None means read from the primary
+        """
+        if not self.replicas:
+            return None
+        if self.pinned:
+            self.pinned_reads += 1
+            return None
+
+        now = time.monotonic()
+        available = [replica for replica in self.replicas if replica.down_until <= now]
+        for replica in available:
+            if now - replica.checked_at >= self.lag_check_interval:
+                self._refresh_lag(replica)
+
+        healthy = [replica for replica in available
+                   if replica.down_until <= now and replica.lag is not None and replica.lag <= self.max_lag]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+
+        # Rotating the start keeps ties (and round robin) spread across replicas
+        offset = next(self._turn) % len(healthy)
+        healthy = healthy[offset:] + healthy[:offset]
+        if self.strategy == ROUTE_ROUND_ROBIN:
+            choice = healthy[0]
+        else:
+            choice = min(healthy, key=lambda replica: replica.pool.in_use)
+        choice.reads += 1
+        return choice
+
+    def mark_failed(self, replica: Replica, error: Exception):
+        """Stop routing to a replica for retry_after seconds"""
+        print(f"Replica {replica.name} unavailable, reading from primary: {error}")
+        replica.failures += 1
+        replica.lag = None
+        replica.down_until = time.monotonic() + self.retry_after
+
+    def stats(self) -> dict:
+        """
+        Snapshot of routing decisions and replica health
+
+        Returns:
+            dict: Reads per replica, primary fallbacks and current lag
+        """
+        now = time.monotonic()
+        return {
+            "pinned": self.pinned,
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "replicas": {
+                replica.name: {
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                    "lag": replica.lag,
+                    "up": replica.down_until <= now,
+                    "in_use": replica.pool.in_use,
+                }
+                for replica in self.replicas
+            },
+        }
+
+    def close(self):
+        """Close every replica pool"""
+        for replica in self.replicas:
+            replica.pool.close()
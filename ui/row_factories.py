@@ -0,0 +1,151 @@
+import keyword
+import threading
+
+# Row representations accepted by DatabaseConnection.execute_query(row_factory=...)
+ROW_DICT = "dict"        # One dict per row (default, most memory)
+ROW_TUPLE = "tuple"      # Plain tuples in column order
+ROW_RECORD = "record"    # __slots__ objects that still support row['col'] and row.get('col')
+ROW_COLUMNS = "columns"  # One list per column: {'col': [v1, v2, ...]}
+
+ROW_FACTORIES = (ROW_DICT, ROW_TUPLE, ROW_RECORD, ROW_COLUMNS)
+
+class Record:
+    """Base class for compact, slot-based result rows"""
+
+    __slots__ = ()
+    _columns = ()
+    _slot_for = {}
+
+    def __init__(self, *values):
+        for slot, value in zip(self.__slots__, values):
+            object.__setattr__(self, slot, value)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.__slots__[key])
+        try:
+            return getattr(self, self._slot_for[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._slot_for
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._columns == other._columns and self.values() == other.values()
+        return NotImplemented
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        """Return the value of a column, or default if the row has no such column"""
+        slot = self._slot_for.get(key)
+        return default if slot is None else getattr(self, slot)
+
+    def keys(self):
+        """Column names in result order"""
+        return self._columns
+
+    def values(self):
+        """Column values in result order"""
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def items(self):
+        """(column, value) pairs in result order"""
+        return zip(self._columns, self.values())
+
+    def as_dict(self) -> dict:
+        """Convert the row to a regular dict"""
+        return dict(self.items())
+
+    def __repr__(self):
+        fields = ", ".join(f"{column}={value!r}" for column, value in self.items())
+        return f"Record({fields})"
+
+# Names a column cannot take as its slot without hiding part of Record
+_RESERVED_NAMES = frozenset(name for name in dir(Record) if not name.startswith("_"))
+
+_record_classes = {}
+_record_classes_lock = threading.Lock()
+
+def record_class(columns):
+    """
+    Get the Record subclass for a column list, creating it on first use
+
+    Columns that are not valid identifiers (e.g. COUNT(*)), clash with a
+    Record method (e.g. keys) or repeat an earlier name get positional slot
+    names. row['name'] still finds the first column of a name, and
+    row[index] finds any column.
+
+    Args:
+        columns (sequence): Column names as reported by the cursor
+
+    Returns:
+        type: Record subclass with one slot per column
+    """
+    columns = tuple(columns)
+    cls = _record_classes.get(columns)
+    if cls is not None:
+        return cls
+
+    slots = []
+    slot_for = {}
+    for index, column in enumerate(columns):
+        if (column.isidentifier() and not keyword.iskeyword(column)
+                and not column.startswith("_") and column not in _RESERVED_NAMES
+                and column not in slot_for):
+            slot = column
+        else:
+            slot = f"_col{index}"
+        slots.append(slot)
+        slot_for.setdefault(column, slot)
+
+    cls = type("Record", (Record,), {
+        "__slots__": tuple(slots),
+        "_columns": columns,
+        "_slot_for": slot_for,
+    })
+    with _record_classes_lock:
+        return _record_classes.setdefault(columns, cls)
+
+def check_row_factory(row_factory: str, allow_columns: bool = True):
+    """
+    Validate a row_factory argument
+
+    Raises:
+        ValueError: If the name is unknown or columns is not allowed here
+    """
+    if row_factory not in ROW_FACTORIES:
+        raise ValueError(f"Unknown row_factory '{row_factory}', expected one of {ROW_FACTORIES}")
+    if row_factory == ROW_COLUMNS and not allow_columns:
+        raise ValueError("row_factory 'columns' needs the whole result set")
+
+def build_rows(rows, columns, row_factory: str):
+    """
+    Convert tuple rows from a cursor into the requested representation
+
+    Args:
+        rows (list): Tuples as returned by a non-dictionary cursor
+        columns (sequence): Column names in result order
+        row_factory (str): One of ROW_FACTORIES
+
+    Returns:
+        list or dict: Rows as tuples, dicts or records, or a column-oriented dict
+    """
+    if row_factory == ROW_TUPLE:
+        return rows if isinstance(rows, list) else list(rows)
+    if row_factory == ROW_RECORD:
+        cls = record_class(columns)
+        return [cls(*row) for row in rows]
+    if row_factory == ROW_COLUMNS:
+        if not rows:
+            return {column: [] for column in columns}
+        return {column: list(values) for column, values in zip(columns, zip(*rows))}
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,240 @@
+"""
+Relevance-ranked search over restaurants, categories and dishes
+
+Uses the full-text indexes of migration 0004: FULLTEXT indexes on MySQL,
+FTS5 tables on SQLite. SQLite builds without FTS5 fall back to LIKE
+matching, which reads every row.
+"""
+import re
+import threading
+from typing import List, NamedTuple, Optional
+from cancellation import CancelToken
+from db_backends import get_backend
+from db_connection import DatabaseConnection
+from row_factories import ROW_RECORD
+
+# Restaurants and dishes returned per search
+SEARCH_LIMIT = 30
+DISH_LIMIT = 10
+
+# Words shorter than this are not in the MySQL full-text index
+# (innodb_ft_min_token_size), so they are left out of every backend's query
+MIN_WORD_LENGTH = 3
+
+# How much a match in a restaurant's own name or description counts
+# against a match in one of its dishes, and a matching category name
+RESTAURANT_WEIGHT = 2.0
+CATEGORY_WEIGHT = 0.5
+
+DIALECT_FULLTEXT = "fulltext"
+DIALECT_FTS5 = "fts5"
+DIALECT_LIKE = "like"
+
+class SearchResults(NamedTuple):
+    """Restaurants and dishes matching a search, best match first"""
+    restaurants: list  # Rows like the home listing plus a relevance column
+    dishes: list  # Available menu items with their restaurant and relevance
+
+_MYSQL_RESTAURANT_MATCH = "MATCH(restaurant_name, description) AGAINST (%s IN BOOLEAN MODE)"
+_MYSQL_DISH_MATCH = "MATCH(item_name, description, category) AGAINST (%s IN BOOLEAN MODE)"
+
+# Parameters: search, search, search, search, category prefix, limit.
+# Restaurants are ranked by the sum of their own, their dishes' and their
+# category's scores; each source is an index lookup
+_RESTAURANTS = {
+    DIALECT_FULLTEXT: f"""
+    SELECT r.*, c.category_name, hits.relevance
+    FROM (
+        SELECT restaurant_id, SUM(score) AS relevance
+        FROM (
+            SELECT restaurant_id, {RESTAURANT_WEIGHT} * {_MYSQL_RESTAURANT_MATCH} AS score
+            FROM Restaurants
+            WHERE {_MYSQL_RESTAURANT_MATCH}
+            UNION ALL
+            SELECT restaurant_id, {_MYSQL_DISH_MATCH}
+            FROM MenuItems
+            WHERE {_MYSQL_DISH_MATCH}
+            UNION ALL
+            SELECT r.restaurant_id, {CATEGORY_WEIGHT}
+            FROM Categories c
+            JOIN Restaurants r ON r.category_id = c.category_id
+            WHERE c.category_name LIKE %s
+        ) matches
+        GROUP BY restaurant_id
+        ORDER BY relevance DESC
+        LIMIT %s
+    ) hits
+    JOIN Restaurants r ON r.restaurant_id = hits.restaurant_id
+    JOIN Categories c ON r.category_id = c.category_id
+    ORDER BY hits.relevance DESC, r.rating DESC
+    """,
+    # bm25() is lower for better matches, hence the negation
+    DIALECT_FTS5: f"""
+    SELECT r.*, c.category_name, hits.relevance
+    FROM (
+        SELECT restaurant_id, SUM(score) AS relevance
+        FROM (
+            SELECT rowid AS restaurant_id, -{RESTAURANT_WEIGHT} * bm25(RestaurantSearch) AS score
+            FROM RestaurantSearch
+            WHERE RestaurantSearch MATCH %s
+            UNION ALL
+            SELECT mi.restaurant_id, -bm25(MenuItemSearch)
+            FROM MenuItemSearch
+            JOIN MenuItems mi ON mi.menu_item_id = MenuItemSearch.rowid
+            WHERE MenuItemSearch MATCH %s
+            UNION ALL
+            SELECT r.restaurant_id, {CATEGORY_WEIGHT}
+            FROM Categories c
+            JOIN Restaurants r ON r.category_id = c.category_id
+            WHERE c.category_name LIKE %s
+        ) matches
+        GROUP BY restaurant_id
+        ORDER BY relevance DESC
+        LIMIT %s
+    ) hits
+    JOIN Restaurants r ON r.restaurant_id = hits.restaurant_id
+    JOIN Categories c ON r.category_id = c.category_id
+    ORDER BY hits.relevance DESC, r.rating DESC
+    """,
+    # Parameters: pattern, pattern x 5, limit
+    DIALECT_LIKE: f"""
+    SELECT r.*, c.category_name,
+           CASE WHEN r.restaurant_name LIKE %s THEN {RESTAURANT_WEIGHT} ELSE 1 END AS relevance
+    FROM Restaurants r
+    JOIN Categories c ON r.category_id = c.category_id
+    WHERE r.restaurant_name LIKE %s
+       OR r.description LIKE %s
+       OR c.category_name LIKE %s
+       OR EXISTS (
+           SELECT 1 FROM MenuItems mi
+           WHERE mi.restaurant_id = r.restaurant_id
+             AND (mi.item_name LIKE %s OR mi.description LIKE %s)
+       )
+    ORDER BY relevance DESC, r.rating DESC
+    LIMIT %s
+    """,
+}
+
+_DISHES = {
+    # Parameters: search, search, limit
+    DIALECT_FULLTEXT: f"""
+    SELECT mi.menu_item_id, mi.item_name, mi.price, mi.category,
+           r.restaurant_id, r.restaurant_name, {_MYSQL_DISH_MATCH} AS relevance
+    FROM MenuItems mi
+    JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
+    WHERE {_MYSQL_DISH_MATCH} AND mi.is_available
+    ORDER BY relevance DESC
+    LIMIT %s
+    """,
+    # Parameters: search, limit
+    DIALECT_FTS5: """
+    SELECT mi.menu_item_id, mi.item_name, mi.price, mi.category,
+           r.restaurant_id, r.restaurant_name, -bm25(MenuItemSearch) AS relevance
+    FROM MenuItemSearch
+    JOIN MenuItems mi ON mi.menu_item_id = MenuItemSearch.rowid
+    JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
+    WHERE MenuItemSearch MATCH %s AND mi.is_available
+    ORDER BY relevance DESC
+    LIMIT %s
+    """,
+    # Parameters: pattern, pattern, pattern, limit
+    DIALECT_LIKE: f"""
+    SELECT mi.menu_item_id, mi.item_name, mi.price, mi.category,
+           r.restaurant_id, r.restaurant_name,
+           CASE WHEN mi.item_name LIKE %s THEN {RESTAURANT_WEIGHT} ELSE 1 END AS relevance
+    FROM MenuItems mi
+    JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
+    WHERE (mi.item_name LIKE %s OR mi.description LIKE %s) AND mi.is_available
+    ORDER BY relevance DESC, mi.item_name
+    LIMIT %s
+    """,
+}
+
+_dialect = None
+_dialect_lock = threading.Lock()
+
+def search_dialect() -> str:
+    """
+    Pick the search implementation for the configured database
+
+    Returns:
+        str: DIALECT_FULLTEXT, DIALECT_FTS5 or DIALECT_LIKE
+    """
+    global _dialect
+    if _dialect is None:
+        with _dialect_lock:
+            if _dialect is None:
+                if get_backend().name == "mysql":
+                    _dialect = DIALECT_FULLTEXT
+                else:
+                    # Missing when this SQLite build has no FTS5
+                    tables = DatabaseConnection.execute_query(
+                        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'RestaurantSearch'",
+                        fetch=True
+                    )
+                    _dialect = DIALECT_FTS5 if tables else DIALECT_LIKE
+    return _dialect
+
+def search_words(term: str) -> List[str]:
+    """Split a search term into the words the full-text indexes can match"""
+    return [word for word in re.findall(r"\w+", term.lower()) if len(word) >= MIN_WORD_LENGTH]
+
+def _statements(dialect: str, term: str, words: List[str], limit: int, dish_limit: int):
+    """The restaurant and dish queries with their parameters"""
+    if dialect == DIALECT_LIKE:
+        pattern = f"%{term}%"
+        return [
+            (_RESTAURANTS[dialect], (pattern,) * 6 + (limit,)),
+            (_DISHES[dialect], (pattern,) * 3 + (dish_limit,)),
+        ]
+
+    # Every word must match, as a prefix so results appear while typing
+    if dialect == DIALECT_FULLTEXT:
+        match = " ".join(f"+{word}*" for word in words)
+        restaurant_params = (match,) * 4
+        dish_params = (match, match)
+    else:
+        match = " ".join(f'"{word}"*' for word in words)
+        restaurant_params = (match, match)
+        dish_params = (match,)
+    category_prefix = f"{term}%"
+    return [
+        (_RESTAURANTS[dialect], restaurant_params + (category_prefix, limit)),
+        (_DISHES[dialect], dish_params + (dish_limit,)),
+    ]
+
+def search(term: str, limit: int = SEARCH_LIMIT, dish_limit: int = DISH_LIMIT,
+           row_factory: str = ROW_RECORD, cancel: Optional[CancelToken] = None) -> SearchResults:
+    """
+    Find restaurants and dishes matching a search term, best match first
+
+    Restaurants match on their name and description, their category name,
+    or any of their dishes. Both queries run concurrently.
+
+    Example:
+        results = search("paneer")
+        for dish in results.dishes:
+            print(dish["item_name"], dish["restaurant_name"])
+
+    Args:
+        term (str): Words as typed by the user; each must match, as a prefix
+        limit (int, optional): Restaurants to return
+        dish_limit (int, optional): Dishes to return
+        row_factory (str, optional): 'dict' or 'record'
+        cancel (CancelToken, optional): Stops both queries when cancelled
+
+    Returns:
+        SearchResults: Matching restaurants and dishes
+    """
+    term = term.strip()
+    words = search_words(term)
+    dialect = search_dialect()
+    if not words and (dialect != DIALECT_LIKE or not term):
+        return SearchResults([], [])
+
+    options = {"row_factory": row_factory, "cancel": cancel}
+    restaurants, dishes = DatabaseConnection.execute_batch([
+        (query, params, options)
+        for query, params in _statements(dialect, term, words, limit, dish_limit)
+    ])
+    return SearchResults(restaurants, dishes)
@@ -0,0 +1,246 @@
+"""
+Decoded image pixels shared between the app's page processes
+
+Every page runs as its own process, so without this each one decoded the
+same restaurant and menu images again. The cache is one memory-mapped file:
+a header, a hash index of fixed-size slots and a ring buffer of raw pixels.
+Entries are keyed by image path and size and carry the source's modification
+time, so a changed image is decoded afresh. Writing wraps around the ring,
+dropping the entries it overwrites.
+
+Processes coordinate with flock, so the cache is only available where fcntl
+is (not on Windows); ImageHandler decodes directly otherwise.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Size of the cache file; 0 disables the shared cache
+SHARED_IMAGE_CACHE_BYTES = int(float(os.environ.get("FOOD_SHARED_IMAGE_CACHE_MB", "32")) * 1024 * 1024)
+
+# Images the index can hold at once
+INDEX_SLOTS = 4096
+# Slots tried for a key before giving up (lookups) or replacing the first (stores)
+_PROBES = 8
+
+_MAGIC = b"FOODPX01"
+_HEADER = struct.Struct("<8sIIQ")  # magic, slots, data bytes, write position
+_HEADER_BYTES = 64
+# key digest, source mtime (ns), width, height, mode, data offset, data length;
+# an all-zero digest marks an empty slot
+_SLOT = struct.Struct("<16sqHHB3xII")
+
+_MODES = {"RGB": 1, "RGBA": 2, "L": 3, "LA": 4}
+_MODE_NAMES = {code: mode for mode, code in _MODES.items()}
+_EMPTY = bytes(16)
+
+class SharedImageCache:
+    """Cross-process cache of decoded pixels in a memory-mapped file"""
+
+    def __init__(self, path, max_bytes=SHARED_IMAGE_CACHE_BYTES, slots=INDEX_SLOTS):
+        """
+        Open the cache file, creating it if needed
+
+        A file of another size or layout is left alone: other pages may
+        have it mapped, and shrinking it under them would crash them.
+        Give each size its own path instead (see cache_path).
+
+        Args:
+            path (str): Cache file, shared by every page
+            max_bytes (int): Size of the file
+            slots (int): Images the index can hold
+
+        Raises:
+            OSError: If the file cannot be opened or mapped
+            ValueError: If the size is too small or the file has another layout
+        """
+        self.path = path
+        self.slots = slots
+        self._index_offset = _HEADER_BYTES
+        self._data_offset = _HEADER_BYTES + slots * _SLOT.size
+        self.data_bytes = max_bytes - self._data_offset
+        if self.data_bytes <= 0:
+            raise ValueError(f"Shared image cache of {max_bytes} bytes is too small")
+
+        # flock locks belong to the open file, which all threads share
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                file_size = os.fstat(self._fd).st_size
+                if file_size == 0:
+                    # New file; nobody can have mapped it yet
+                    os.ftruncate(self._fd, max_bytes)
+                    os.pwrite(self._fd, _HEADER.pack(_MAGIC, slots, self.data_bytes, 0), 0)
+                elif file_size != max_bytes:
+                    raise ValueError(f"{path} is {file_size} bytes, expected {max_bytes}")
+                # Checked before mapping, so a mismatch leaves nothing to unmap
+                magic, file_slots, _, _ = _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))
+                if magic != _MAGIC or file_slots != slots:
+                    raise ValueError(f"{path} is not a shared image cache with {slots} index slots")
+                self._map = mmap.mmap(self._fd, max_bytes)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    @staticmethod
+    def cache_path(directory, max_bytes=SHARED_IMAGE_CACHE_BYTES):
+        """Cache file for a size, so pages configured differently never share one"""
+        return os.path.join(directory, f"pixels.{max_bytes}.cache")
+
+    @classmethod
+    def open(cls, path, max_bytes=SHARED_IMAGE_CACHE_BYTES):
+        """
+        Open the cache if this platform and configuration allow it
+
+        Returns:
+            SharedImageCache or None: None when disabled or unavailable
+        """
+        if fcntl is None or max_bytes <= 0:
+            return None
+        try:
+            return cls(path, max_bytes)
+        except (OSError, ValueError) as e:
+            print(f"Shared image cache unavailable: {e}")
+            return None
+
+    def _digest(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        # Keep real keys distinct from the empty-slot marker
+        return digest if digest != _EMPTY else b"\x01" + digest[1:]
+
+    def _probe(self, digest):
+        """Index slot offsets a key may occupy, in probe order"""
+        first = int.from_bytes(digest[:4], "little") % self.slots
+        return [
+            self._index_offset + ((first + i) % self.slots) * _SLOT.size
+            for i in range(min(_PROBES, self.slots))
+        ]
+
+    def get(self, key, mtime_ns):
+        """
+        Look up an image's pixels
+
+        Args:
+            key: Image identity, e.g. (path, width, height)
+            mtime_ns (int): Modification time of the source image
+
+        Returns:
+            PIL.Image.Image or None: A private copy of the pixels, None if
+                absent or decoded from another version of the source
+        """
+        digest = self._digest(key)
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                for slot in self._probe(digest):
+                    entry = _SLOT.unpack_from(self._map, slot)
+                    if entry[0] != digest:
+                        continue
+                    _, entry_mtime, width, height, mode, offset, length = entry
+                    if entry_mtime != mtime_ns:
+                        break
+                    start = self._data_offset + offset
+                    pixels = self._map[start:start + length]
+                    self.hits += 1
+                    return Image.frombytes(_MODE_NAMES[mode], (width, height), pixels)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self.misses += 1
+            return None
+
+    def put(self, key, mtime_ns, image):
+        """
+        Store an image's pixels for the other pages
+
+        Images in other pixel formats, or too large for a quarter of the
+        ring, are not stored.
+
+        Args:
+            key: Image identity, e.g. (path, width, height)
+            mtime_ns (int): Modification time of the source image
+            image (PIL.Image.Image): Decoded image
+        """
+        mode = _MODES.get(image.mode)
+        if mode is None:
+            return
+        pixels = image.tobytes()
+        length = len(pixels)
+        if length > self.data_bytes // 4:
+            return
+
+        digest = self._digest(key)
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                magic, slots, data_bytes, position = _HEADER.unpack_from(self._map, 0)
+                if position + length > data_bytes:
+                    position = 0
+                self._drop_overlapping(position, position + length)
+
+                start = self._data_offset + position
+                self._map[start:start + length] = pixels
+
+                # Reuse the key's slot, else an empty one, else the first probed
+                probes = self._probe(digest)
+                target = probes[0]
+                for slot in probes:
+                    slot_digest = self._map[slot:slot + 16]
+                    if slot_digest == digest:
+                        target = slot
+                        break
+                    if slot_digest == _EMPTY and target == probes[0]:
+                        target = slot
+                _SLOT.pack_into(self._map, target, digest, mtime_ns, image.width, image.height,
+                                mode, position, length)
+                _HEADER.pack_into(self._map, 0, magic, slots, data_bytes, position + length)
+                self.stores += 1
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _drop_overlapping(self, start, end):
+        """Empty the index slots whose pixels lie in [start, end) of the ring"""
+        for index in range(self.slots):
+            slot = self._index_offset + index * _SLOT.size
+            entry = _SLOT.unpack_from(self._map, slot)
+            if entry[0] != _EMPTY and entry[5] < end and entry[5] + entry[6] > start:
+                self._map[slot:slot + 16] = _EMPTY
+
+    def stats(self) -> dict:
+        """
+        Snapshot of this process's use of the cache
+
+        Returns:
+            dict: File size and hit/miss/store counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "data_bytes": self.data_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+        }
+
+    def close(self):
+        """Unmap and close the cache file"""
+        with self._lock:
+            self._map.close()
+            os.close(self._fd)
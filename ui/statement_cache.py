@@ -0,0 +1,105 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+class StatementCache:
+    """Bounded per-connection cache of server-side prepared statements"""
+
+    def __init__(self, max_statements: int = 64):
+        """
+        Initialize the cache
+
+        Args:
+            max_statements (int): Prepared statements kept per connection;
+                the least recently used one is closed beyond that
+        """
+        self.max_statements = max_statements
+        self._per_connection = weakref.WeakKeyDictionary()  # connection -> OrderedDict(sql -> cursor)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cursor(self, connection, query: str):
+        """
+        Get the prepared cursor for a statement on a connection
+
+        The caller must hold the connection (checked out from the pool), so
+        the connection's own entries are never used by two threads at once.
+
+        Args:
+            connection: Open connection supporting cursor(prepared=True)
+            query (str): SQL text with %s placeholders
+
+        Returns:
+            Prepared cursor; leave it open, the cache owns it
+        """
+        with self._lock:
+            statements = self._per_connection.get(connection)
+            if statements is None:
+                statements = self._per_connection[connection] = OrderedDict()
+
+        cursor = statements.get(query)
+        if cursor is not None:
+            statements.move_to_end(query)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = connection.cursor(prepared=True)
+        statements[query] = cursor
+        while len(statements) > self.max_statements:
+            _, evicted = statements.popitem(last=False)
+            self.evictions += 1
+            self._close_quietly(evicted)
+        return cursor
+
+    def discard(self, connection, query: str = None):
+        """
+        Forget prepared statements of a connection
+
+        Args:
+            connection: Connection whose statements to drop
+            query (str, optional): Only drop this statement
+        """
+        with self._lock:
+            statements = self._per_connection.get(connection)
+            if statements is None:
+                return
+            if query is None:
+                del self._per_connection[connection]
+                dropped = list(statements.values())
+            else:
+                dropped = [statements.pop(query)] if query in statements else []
+
+        for cursor in dropped:
+            self._close_quietly(cursor)
+
+    def _close_quietly(self, cursor):
+        """Deallocate a statement, ignoring errors from a dead connection"""
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        """
+        Snapshot of prepared statement reuse
+
+        Returns:
+            dict: Connections tracked, statements prepared and hit/miss counters
+        """
+        with self._lock:
+            statements = sum(len(entries) for entries in self._per_connection.values())
+            connections = len(self._per_connection)
+        lookups = self.hits + self.misses
+        return {
+            "connections": connections,
+            "statements": statements,
+            "max_statements": self.max_statements,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
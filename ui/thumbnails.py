@@ -0,0 +1,134 @@
+"""
+Exact-size thumbnails of the app's images, kept on disk
+
+Every page shows an image at one fixed size, so scaling the full source on
+each page load wastes CPU. Each (image, size) pair is scaled once and stored
+under images/thumbnails with the source's modification time; a thumbnail
+whose time no longer matches is regenerated on next use.
+
+Generate every size the pages use ahead of time with:
+
+    python thumbnails.py
+"""
+import argparse
+import os
+from PIL import Image
+
+THUMBNAIL_DIRECTORY = "thumbnails"
+
+# Sizes the pages show, by image folder
+THUMBNAIL_SIZES = {
+    "restaurants": [(320, 170), (300, 180), (40, 40), (24, 24)],
+    "menu_items": [(120, 120), (80, 80), (70, 70)],
+    "categories": [(24, 24)],
+}
+
+def thumbnail_path(base_directory, image_path, size):
+    """
+    Where the thumbnail of an image at a size is stored
+
+    Returns:
+        str or None: Thumbnail path, None for images outside base_directory
+    """
+    relative = os.path.relpath(image_path, base_directory)
+    if relative.startswith(os.pardir) or relative.startswith(THUMBNAIL_DIRECTORY + os.sep):
+        return None
+    stem, _ = os.path.splitext(relative)
+    return os.path.join(base_directory, THUMBNAIL_DIRECTORY, f"{stem}_{size[0]}x{size[1]}.png")
+
+def is_stale(source_path, thumb_path) -> bool:
+    """Whether a thumbnail is missing or was made from another version of its source"""
+    try:
+        thumb_mtime = os.stat(thumb_path).st_mtime_ns
+    except FileNotFoundError:
+        return True
+    return thumb_mtime != os.stat(source_path).st_mtime_ns
+
+def make_thumbnail(source_path, thumb_path, size):
+    """
+    Scale an image to exactly size and store it as a PNG
+
+    The file is written under a temporary name and moved into place, so other
+    pages never read a partial thumbnail. It takes the source's modification
+    time, which is what is_stale compares.
+    """
+    source_mtime = os.stat(source_path).st_mtime_ns
+    with Image.open(source_path) as source:
+        # JPEG sources decode straight at a reduced scale
+        source.draft("RGB", size)
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA")
+        thumb = source.resize(size, Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+    temp_path = f"{thumb_path}.{os.getpid()}.tmp"
+    thumb.save(temp_path, "PNG")
+    os.utime(temp_path, ns=(source_mtime, source_mtime))
+    os.replace(temp_path, thumb_path)
+
+def ensure_thumbnail(base_directory, image_path, size):
+    """
+    Get the file to load for an image at a size, making its thumbnail if needed
+
+    Args:
+        base_directory (str): The image handler's base directory
+        image_path (str): Source image
+        size (tuple): Width and height the image is shown at
+
+    Returns:
+        str: Path of an up-to-date thumbnail, or image_path if there is none
+    """
+    thumb_path = thumbnail_path(base_directory, image_path, size)
+    if thumb_path is None:
+        return image_path
+    try:
+        if is_stale(image_path, thumb_path):
+            make_thumbnail(image_path, thumb_path, size)
+        return thumb_path
+    except Exception as e:
+        print(f"Error creating thumbnail {thumb_path}: {e}")
+        return image_path
+
+def generate_all(base_directory="images/", force=False):
+    """
+    Make the thumbnails of every image at every size in THUMBNAIL_SIZES
+
+    Args:
+        base_directory (str): The image handler's base directory
+        force (bool): Regenerate thumbnails that are up to date
+
+    Returns:
+        tuple: Thumbnails made, thumbnails already up to date
+    """
+    made = fresh = 0
+    for folder, sizes in THUMBNAIL_SIZES.items():
+        directory = os.path.join(base_directory, folder)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            image_path = os.path.join(directory, name)
+            if not os.path.isfile(image_path):
+                continue
+            for size in sizes:
+                thumb_path = thumbnail_path(base_directory, image_path, size)
+                if not force and not is_stale(image_path, thumb_path):
+                    fresh += 1
+                    continue
+                try:
+                    make_thumbnail(image_path, thumb_path, size)
+                    made += 1
+                except Exception as e:
+                    print(f"Error creating thumbnail {thumb_path}: {e}")
+    return made, fresh
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate image thumbnails for every page size")
+    parser.add_argument("--base-directory", default="images/", help="Image directory of the app")
+    parser.add_argument("--force", action="store_true", help="Regenerate up-to-date thumbnails too")
+    args = parser.parse_args()
+
+    made, fresh = generate_all(args.base_directory, args.force)
+    print(f"Created {made} thumbnails, {fresh} already up to date")
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,24 @@ import sys
 import os
 from PIL import Image
 from db_connection import DatabaseConnection
+from row_factories import ROW_RECORD
 from datetime import datetime, timedelta
 from image_handler import ImageHandler
+from order_status import ACTIVE_ORDERS_CONDITION, OrderStatus
+
+# Items of the user's orders that are not delivered yet, newest first
+ACTIVE_ORDERS = f"""
+SELECT o.order_id, o.total_amount, o.order_date, o.status, 
+       o.estimated_delivery_time, o.delivery_address,
+       r.restaurant_id, r.restaurant_name, 
+       oi.quantity, mi.menu_item_id, mi.item_name, mi.price
+FROM Orders o
+JOIN OrderItems oi ON o.order_id = oi.order_id
+JOIN MenuItems mi ON oi.menu_item_id = mi.menu_item_id
+JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
+WHERE o.user_id = %s AND {ACTIVE_ORDERS_CONDITION}
+ORDER BY o.order_date DESC
+"""
 
 class OrderTrackingApp:
     def __init__(self, user_id=None):
@@ -27,10 +43,10 @@ class OrderTrackingApp:
 
         # Order status mapping
         self.status_map = {
-            0: "Order Placed",
-            1: "Preparing",
-            2: "Out for Delivery",
-            3: "Delivered"
+            OrderStatus.PLACED: "Order Placed",
+            OrderStatus.PREPARING: "Preparing",
+            OrderStatus.OUT_FOR_DELIVERY: "Out for Delivery",
+            OrderStatus.DELIVERED: "Delivered"
         }
 
         # Fetch orders for the user
@@ -50,22 +66,11 @@ class OrderTrackingApp:
             return []
 
         try:
-            query = """
-            SELECT o.order_id, o.total_amount, o.order_date, o.status, 
-                   o.estimated_delivery_time, o.delivery_address,
-                   r.restaurant_id, r.restaurant_name, 
-                   oi.quantity, mi.menu_item_id, mi.item_name, mi.price
-            FROM Orders o
-            JOIN OrderItems oi ON o.order_id = oi.order_id
-            JOIN MenuItems mi ON oi.menu_item_id = mi.menu_item_id
-            JOIN Restaurants r ON mi.restaurant_id = r.restaurant_id
-            WHERE o.user_id = %s AND o.status < 3
-            ORDER BY o.order_date DESC
-            """
             orders = DatabaseConnection.execute_query(
-                query, 
+                ACTIVE_ORDERS, 
                 params=(self.user_id,), 
-                fetch=True
+                fetch=True,
+                row_factory=ROW_RECORD
             )
             return orders
         except Exception as e:
@@ -285,7 +290,7 @@ class OrderTrackingApp:
         # Calculate widths
         step_width = 220  # Approximate width per step
         total_width = step_width * len(status_steps)
-        current_status = self.current_order.get('status', 0)
+        current_status = OrderStatus(self.current_order.get('status', OrderStatus.PLACED))
         progress_width = step_width * current_status + (step_width/2 if current_status > 0 else 0)
         
         # Progress line container